@@ -0,0 +1,198 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+class CommonOpponentState:
+    """Running common-opponent points for every pair, updated one game at a time.
+
+    Keeps beat/lost/played indicator matrices together with
+    points = beat @ lost.T and common = played @ played.T. A game only
+    changes the (winner, loser) and (loser, winner) cells of the indicators,
+    so applying it patches two rows and two columns of points and common
+    (O(teams)) instead of recomputing the products.
+    """
+
+    def __init__(self, n_teams, rule='last'):
+        if rule not in ('any', 'last'):
+            raise ValueError(f"Unknown rule: {rule}")
+        self.rule = rule
+        self.wins = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.beat = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.lost = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.played = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.points = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.common = np.zeros((n_teams, n_teams), dtype=np.int32)
+
+    def predict(self, team1, team2):
+        """Get (team1_points, team2_points, common opponents) from the current state."""
+        return int(self.points[team1, team2]), int(self.points[team2, team1]), int(self.common[team1, team2])
+
+    def apply(self, winner, loser):
+        """Add one game's result."""
+        self.wins[winner, loser] += 1
+        cells = [(winner, loser), (loser, winner)]
+        
+        # New indicator values at the two touched cells
+        if self.rule == 'last':
+            new_beat = [1, 0]
+        else:
+            new_beat = [int(self.wins[a, o] > 0) for a, o in cells]
+        new_lost = [1 - b for b in new_beat]
+        
+        # points = beat @ lost.T: first the beat change against the old lost ...
+        for (a, o), value in zip(cells, new_beat):
+            delta = value - self.beat[a, o]
+            if delta:
+                self.points[a, :] += delta * self.lost[:, o]
+                self.beat[a, o] = value
+        # ... then the lost change against the new beat
+        for (b, o), value in zip(cells, new_lost):
+            delta = value - self.lost[b, o]
+            if delta:
+                self.points[:, b] += self.beat[:, o] * delta
+                self.lost[b, o] = value
+        
+        # common = played @ played.T, one new cell at a time
+        for a, o in cells:
+            if not self.played[a, o]:
+                column = self.played[:, o].copy()
+                self.common[a, :] += column
+                self.common[:, a] += column
+                self.common[a, a] += 1
+                self.played[a, o] = 1
+
+class CommonOpponentBacktest:
+    """Walk-forward replay of the common-opponent prediction rule.
+
+    Games are replayed in kickoff order. Every game kicking off at the same
+    time is predicted from the state before any of them, then all of them
+    are applied. rule='last' is run_predictor.py's rule, rule='any' is
+    nfl-scores.py's. State is reset at the start of every season.
+    """
+
+    def __init__(self, games_df, rule='last', reset_each_season=True):
+        self.games_df = games_df
+        self.rule = rule
+        self.reset_each_season = reset_each_season
+
+    def run(self):
+        """Replay every completed game; returns (per-game DataFrame, per-week DataFrame)."""
+        games = self.games_df
+        completed = pd.to_numeric(games['winner_pts'], errors='coerce').notna().to_numpy()
+        games = games[completed]
+        
+        winners = games['winner'].astype(str).to_numpy()
+        losers = games['loser'].astype(str).to_numpy()
+        teams = sorted(set(winners) | set(losers))
+        winner_ids = pd.Categorical(winners, categories=teams).codes
+        loser_ids = pd.Categorical(losers, categories=teams).codes
+        dates = pd.to_datetime(games['date']).to_numpy()
+        if 'season' in games.columns:
+            seasons = games['season'].to_numpy()
+        else:
+            date_index = pd.DatetimeIndex(dates)
+            seasons = (date_index.year - (date_index.month < 3)).to_numpy()
+        weeks = games['week'].astype(str).to_numpy()
+        
+        order = np.lexsort((np.arange(len(games)), dates, seasons))
+        
+        records = []
+        week_seconds = {}
+        state = None
+        current_season = None
+        start = 0
+        while start < len(order):
+            # Games sharing one kickoff time are predicted together
+            stop = start + 1
+            while stop < len(order) and dates[order[stop]] == dates[order[start]] and seasons[order[stop]] == seasons[order[start]]:
+                stop += 1
+            batch = order[start:stop]
+            
+            timer = time.perf_counter()
+            season = seasons[batch[0]]
+            if state is None or (self.reset_each_season and season != current_season):
+                state = CommonOpponentState(len(teams), self.rule)
+                current_season = season
+            
+            for g in batch:
+                winner_points, loser_points, common = state.predict(winner_ids[g], loser_ids[g])
+                records.append((
+                    season, weeks[g], dates[g], winners[g], losers[g], common,
+                    winner_points, loser_points
+                ))
+            for g in batch:
+                state.apply(winner_ids[g], loser_ids[g])
+            
+            key = (season, weeks[batch[0]])
+            week_seconds[key] = week_seconds.get(key, 0.0) + time.perf_counter() - timer
+            start = stop
+        
+        results = pd.DataFrame(records, columns=[
+            'season', 'week', 'date', 'winner', 'loser', 'common_opponents',
+            'winner_points', 'loser_points'
+        ])
+        results['covered'] = results['common_opponents'] > 0
+        results['predicted'] = results['covered'] & (results['winner_points'] != results['loser_points'])
+        results['correct'] = results['predicted'] & (results['winner_points'] > results['loser_points'])
+        
+        weekly = results.groupby(['season', 'week'], sort=False).agg(
+            games=('winner', 'size'),
+            covered=('covered', 'sum'),
+            predicted=('predicted', 'sum'),
+            correct=('correct', 'sum'),
+        ).reset_index()
+        weekly['coverage'] = weekly['covered'] / weekly['games']
+        weekly['accuracy'] = weekly['correct'] / weekly['predicted'].where(weekly['predicted'] > 0)
+        weekly['seconds'] = [week_seconds[(s, w)] for s, w in zip(weekly['season'], weekly['week'])]
+        return results, weekly
+
+def summarize(results):
+    """Get overall accuracy and coverage of a backtest."""
+    predicted = int(results['predicted'].sum())
+    return {
+        'games': len(results),
+        'coverage': float(results['covered'].mean()) if len(results) else 0.0,
+        'predicted': predicted,
+        'accuracy': float(results['correct'].sum() / predicted) if predicted else None,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of the common-opponent rule')
+    parser.add_argument('first_season', type=int)
+    parser.add_argument('last_season', type=int)
+    parser.add_argument('--rule', choices=['last', 'any'], default='last',
+                        help="'last' as run_predictor.py, 'any' as nfl-scores.py")
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    from nfl_data_prep import NFLDataPreprocessor
+    
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    preprocessor = NFLDataPreprocessor()
+    if not preprocessor.load_data(range(args.first_season, args.last_season + 1)):
+        print("Failed to load data")
+        return
+    
+    results, weekly = CommonOpponentBacktest(preprocessor.games_df, rule=args.rule).run()
+    
+    print("\nWeek-by-week results:")
+    print("=====================")
+    for row in weekly.itertuples(index=False):
+        accuracy = f"{row.accuracy:.3f}" if pd.notna(row.accuracy) else "  n/a"
+        print(f"{row.season} week {row.week:>9}: {row.correct:>3}/{row.predicted:<3} correct "
+              f"(accuracy {accuracy}, coverage {row.coverage:.2f}) in {row.seconds * 1000:.2f} ms")
+    
+    summary = summarize(results)
+    print(f"\nGames: {summary['games']}")
+    print(f"Coverage: {summary['coverage']:.3f}")
+    if summary['accuracy'] is not None:
+        print(f"Accuracy: {summary['accuracy']:.3f} over {summary['predicted']} predicted games")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from check_data import get_common_opponents
+from common_opponents import CommonOpponentEngine
+from nfl_data_prep import NFLDataPreprocessor, TeamIndex
+from nfl_features import TeamFeatureBuilder
+from run_predictor import analyze_common_opponents
+from synthetic_league import write_league
+
+def load_script(name, filename):
+    """Import a script whose file name is not a valid module name."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+nfl_scores = load_script('nfl_scores', 'nfl-scores.py')
+
+def measure(fn, track_memory=True):
+    """Run fn once for wall time and, optionally, once more under tracemalloc for peak memory."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn()
+        wall_time = time.perf_counter() - start
+        
+        peak_memory = None
+        if track_memory:
+            tracemalloc.start()
+            fn()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return wall_time, peak_memory
+
+def sample_pairs(teams, max_pairs, seed=0):
+    """Get up to max_pairs (team1, team2) pairs, all of them when there are few enough."""
+    rows, cols = np.triu_indices(len(teams), k=1)
+    if len(rows) > max_pairs:
+        keep = np.sort(np.random.default_rng(seed).choice(len(rows), max_pairs, replace=False))
+        rows, cols = rows[keep], cols[keep]
+    return [(teams[i], teams[j]) for i, j in zip(rows, cols)]
+
+def benchmark_size(n_teams, n_seasons, games_per_team, max_pairs=500, train=True, track_memory=True):
+    """Time every stage on one synthetic league size; returns a list of result dicts."""
+    results = []
+    
+    def record(stage, fn, items, unit):
+        wall_time, peak_memory = measure(fn, track_memory)
+        results.append({
+            'teams': n_teams,
+            'seasons': n_seasons,
+            'games_per_team': games_per_team,
+            'stage': stage,
+            'wall_time_s': wall_time,
+            'peak_memory_mb': None if peak_memory is None else peak_memory / 1024 ** 2,
+            'items': items,
+            'unit': unit,
+            'throughput_per_s': items / wall_time if wall_time > 0 else None,
+        })
+        print(f"  {stage:<28} {wall_time * 1000:>10.1f} ms  {items / wall_time if wall_time > 0 else 0:>12.0f} {unit}/s")
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        seasons = write_league(data_dir, n_teams, n_seasons, games_per_team)
+        
+        # Cold load parses the CSVs and builds the cache; warm load reads the cache
+        def load(cache_dir):
+            preprocessor = NFLDataPreprocessor(data_dir, cache_dir=cache_dir)
+            preprocessor.load_data(seasons)
+            return preprocessor.games_df
+        
+        n_cold = [0]
+        def load_cold():
+            n_cold[0] += 1
+            load(os.path.join(data_dir, f'.cold_cache_{n_cold[0]}'))
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            games_df = load(None)
+        n_games = len(games_df)
+        record('load_data (cold)', load_cold, n_games, 'games')
+        record('load_data (cached)', lambda: load(None), n_games, 'games')
+    
+    index = TeamIndex(games_df)
+    record('TeamIndex', lambda: TeamIndex(games_df), n_games, 'games')
+    
+    pairs = sample_pairs(index.teams, max_pairs)
+    record('get_common_opponents', lambda: [
+        get_common_opponents(games_df, t1, t2, index) for t1, t2 in pairs
+    ], len(pairs), 'pairs')
+    record('analyze_team_performance', lambda: [
+        nfl_scores.analyze_team_performance(games_df, t1, t2, index) for t1, t2 in pairs
+    ], len(pairs), 'pairs')
+    record('analyze_common_opponents', lambda: [
+        analyze_common_opponents(games_df, t1, t2, index) for t1, t2 in pairs
+    ], len(pairs), 'pairs')
+    
+    n_all_pairs = n_teams * (n_teams - 1) // 2
+    record('CommonOpponentEngine', lambda: CommonOpponentEngine(index), n_all_pairs, 'pairs')
+    record('TeamFeatureBuilder', lambda: TeamFeatureBuilder(games_df).build_training_set(), n_games, 'games')
+    
+    if train:
+        try:
+            from nfl_predictor import NFLPredictor
+            import tensorflow  # noqa: F401
+        except ImportError as e:
+            print(f"  Skipping NFLPredictor stages: {str(e)}")
+            return results
+        
+        X, y, _ = TeamFeatureBuilder(games_df).build_training_set()
+        team_histories = TeamFeatureBuilder(games_df).latest_state()
+        predictor = NFLPredictor()
+        record('NFLPredictor.train (5 epochs)', lambda: predictor.train(X, y, epochs=5), len(X), 'games')
+        
+        few_pairs = pairs[:20]
+        record('NFLPredictor.predict_game', lambda: [
+            predictor.predict_game(team_histories[t1], team_histories[t2]) for t1, t2 in few_pairs
+        ], len(few_pairs), 'pairs')
+        record('NFLPredictor.predict_games', lambda: predictor.predict_games(
+            pairs, team_histories=team_histories
+        ), len(pairs), 'pairs')
+    
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_file):
+    """Print wall time ratios against a previous benchmark file."""
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    key = lambda r: (r['teams'], r['seasons'], r['games_per_team'], r['stage'])
+    previous = {key(r): r for r in baseline['results']}
+    
+    print(f"\nCompared with {baseline_file} ({baseline.get('commit') or 'unknown commit'}):")
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        ratio = result['wall_time_s'] / old['wall_time_s'] if old['wall_time_s'] > 0 else float('inf')
+        flag = '  REGRESSION' if ratio > 1.2 else ''
+        print(f"  {result['teams']}x{result['seasons']} {result['stage']:<28} {ratio:>6.2f}x{flag}")
+
+def parse_size(text):
+    """Parse TEAMSxSEASONS[xGAMES] (e.g. 32x10 or 64x5x17)."""
+    parts = [int(p) for p in text.lower().split('x')]
+    if len(parts) == 2:
+        parts.append(17)
+    return tuple(parts)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark load, analysis and prediction stages on synthetic leagues')
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(32, 1, 17), (32, 10, 17), (64, 10, 17)],
+                        help='League sizes as TEAMSxSEASONS[xGAMES_PER_TEAM]')
+    parser.add_argument('--max-pairs', type=int, default=500,
+                        help='Pairs to run the per-pair functions on')
+    parser.add_argument('--skip-train', action='store_true',
+                        help='Skip the NFLPredictor stages')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc pass for peak memory')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='JSON file to save results to')
+    parser.add_argument('--compare',
+                        help='Previous results JSON to compare wall times against')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    results = []
+    for n_teams, n_seasons, games_per_team in args.sizes:
+        print(f"\n{n_teams} teams, {n_seasons} seasons, {games_per_team} games per team:")
+        results.extend(benchmark_size(
+            n_teams, n_seasons, games_per_team,
+            max_pairs=args.max_pairs, train=not args.skip_train, track_memory=not args.no_memory
+        ))
+    
+    with open(args.output, 'w') as f:
+        json.dump({
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"\nSaved results to: {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
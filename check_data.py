@@ -1,28 +1,16 @@
-from nfl_data_prep import NFLDataPreprocessor
+from nfl_data_prep import NFLDataPreprocessor, TeamIndex
+import instrumentation
+import argparse
 
-def get_common_opponents(games_df, team1, team2):
+def get_common_opponents(games_df, team1, team2, index=None):
     """Get list of common opponents and their games"""
-    # Get all opponents for team1
-    team1_games = games_df[
-        (games_df['winner'] == team1) | (games_df['loser'] == team1)
-    ]
-    team1_opponents = set()
-    for _, game in team1_games.iterrows():
-        if game['winner'] == team1:
-            team1_opponents.add(game['loser'])
-        else:
-            team1_opponents.add(game['winner'])
-            
-    # Get all opponents for team2
-    team2_games = games_df[
-        (games_df['winner'] == team2) | (games_df['loser'] == team2)
-    ]
-    team2_opponents = set()
-    for _, game in team2_games.iterrows():
-        if game['winner'] == team2:
-            team2_opponents.add(game['loser'])
-        else:
-            team2_opponents.add(game['winner'])
+    instrumentation.count('pairs_evaluated')
+    if index is None:
+        index = TeamIndex(games_df)
+    
+    # Get all opponents for each team
+    team1_opponents = index.get_opponents(team1)
+    team2_opponents = index.get_opponents(team2)
     
     # Find common opponents
     common = team1_opponents.intersection(team2_opponents)
@@ -30,41 +18,38 @@ def get_common_opponents(games_df, team1, team2):
     common = common - {team1, team2}
     return sorted(list(common))
 
-def show_matchups_against_opponent(games_df, team1, team2, opponent):
+def show_matchups_against_opponent(games_df, team1, team2, opponent, index=None):
     """Show how both teams performed against a specific opponent"""
+    if index is None:
+        index = TeamIndex(games_df)
+    
     print(f"\nGames against {opponent}:")
     
     # Get team1's games against opponent
-    team1_games = games_df[
-        ((games_df['winner'] == team1) & (games_df['loser'] == opponent)) |
-        ((games_df['winner'] == opponent) & (games_df['loser'] == team1))
-    ].sort_values('date')
+    team1_games = index.get_head_to_head_games(team1, opponent)
     
     print(f"\n{team1} vs {opponent}:")
-    for _, game in team1_games.iterrows():
-        date = game['date'].strftime('%Y-%m-%d')
-        if game['winner'] == team1:
-            print(f"{date}: {team1} WON {game['winner_pts']}-{game['loser_pts']}")
+    for game in team1_games.itertuples(index=False):
+        date = game.date.strftime('%Y-%m-%d')
+        if game.winner == team1:
+            print(f"{date}: {team1} WON {game.winner_pts}-{game.loser_pts}")
         else:
-            print(f"{date}: {team1} LOST {game['loser_pts']}-{game['winner_pts']}")
+            print(f"{date}: {team1} LOST {game.loser_pts}-{game.winner_pts}")
     
     # Get team2's games against opponent
-    team2_games = games_df[
-        ((games_df['winner'] == team2) & (games_df['loser'] == opponent)) |
-        ((games_df['winner'] == opponent) & (games_df['loser'] == team2))
-    ].sort_values('date')
+    team2_games = index.get_head_to_head_games(team2, opponent)
     
     print(f"\n{team2} vs {opponent}:")
-    for _, game in team2_games.iterrows():
-        date = game['date'].strftime('%Y-%m-%d')
-        if game['winner'] == team2:
-            print(f"{date}: {team2} WON {game['winner_pts']}-{game['loser_pts']}")
+    for game in team2_games.itertuples(index=False):
+        date = game.date.strftime('%Y-%m-%d')
+        if game.winner == team2:
+            print(f"{date}: {team2} WON {game.winner_pts}-{game.loser_pts}")
         else:
-            print(f"{date}: {team2} LOST {game['loser_pts']}-{game['winner_pts']}")
+            print(f"{date}: {team2} LOST {game.loser_pts}-{game.winner_pts}")
     
     # Compare results
-    team1_won = any(game['winner'] == team1 for _, game in team1_games.iterrows())
-    team2_won = any(game['winner'] == team2 for _, game in team2_games.iterrows())
+    team1_won = index.has_beaten(team1, opponent)
+    team2_won = index.has_beaten(team2, opponent)
     
     if team1_won and not team2_won:
         print(f"\nPoint to {team1} (beat team that {team2} lost to)")
@@ -76,7 +61,15 @@ def show_matchups_against_opponent(games_df, team1, team2, opponent):
         print("\nNo points awarded (similar results)")
         return 0, 0
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare two teams on common opponents')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    
     # Initialize preprocessor
     preprocessor = NFLDataPreprocessor()
     
@@ -90,7 +83,7 @@ def main():
     team2 = "Philadelphia Eagles"
     
     # Find common opponents
-    common_opponents = get_common_opponents(preprocessor.games_df, team1, team2)
+    common_opponents = get_common_opponents(preprocessor.games_df, team1, team2, preprocessor.index)
     print(f"\nFound {len(common_opponents)} common opponents:")
     for opponent in common_opponents:
         print(f"- {opponent}")
@@ -102,7 +95,7 @@ def main():
     
     for opponent in common_opponents:
         t1_points, t2_points = show_matchups_against_opponent(
-            preprocessor.games_df, team1, team2, opponent
+            preprocessor.games_df, team1, team2, opponent, preprocessor.index
         )
         team1_points += t1_points
         team2_points += t2_points
@@ -0,0 +1,193 @@
+import numpy as np
+
+import instrumentation
+
+def result_indicators(wins_matrix, last_result_matrix=None, rule='any'):
+    """Get (beat, lost, played) team x opponent indicator matrices for a rule."""
+    played = (wins_matrix + wins_matrix.T) > 0
+    if rule == 'any':
+        beat = wins_matrix > 0
+        lost = played & ~beat
+    elif rule == 'last':
+        beat = last_result_matrix > 0
+        lost = last_result_matrix < 0
+    else:
+        raise ValueError(f"Unknown rule: {rule}")
+    return beat, lost, played
+
+def common_opponent_points(wins_matrix, last_result_matrix=None, rule='any'):
+    """Get (points, common_counts) team x team matrices from result matrices.
+
+    points[i, j] is team i's common-opponent points against team j and
+    common_counts[i, j] the number of common opponents.
+    """
+    beat, lost, played = result_indicators(wins_matrix, last_result_matrix, rule)
+    played = played.astype(np.int32)
+    points = beat.astype(np.int32) @ lost.astype(np.int32).T
+    common_counts = played @ played.T
+    np.fill_diagonal(common_counts, 0)
+    return points, common_counts
+
+def _diagonal(x):
+    return np.diagonal(x, axis1=-2, axis2=-1)
+
+def _swap(x):
+    return np.swapaxes(x, -2, -1)
+
+def chain_counts(beat, lost, max_hops=3):
+    """Get [chains_1, ..., chains_max_hops] for chains through 1-3 opponents.
+
+    chains_k[i, j] counts chains i beat o1, o1 beat o2, ..., and j lost to
+    o_k, none of the o's being i or j. chains_1 is the common-opponent
+    points table. Longer chains are counted for all pairs at once by
+    subtracting the closed walks through i or j from the matrix powers.
+    Works on a single (T, T) pair of matrices or a stack of them (one per
+    season).
+    """
+    if not 1 <= max_hops <= 3:
+        raise ValueError(f"max_hops must be 1, 2 or 3, got {max_hops}")
+    # Float matmul uses BLAS and is exact for these counts
+    B = np.asarray(beat, dtype=np.float64)
+    Q = _swap(np.asarray(lost, dtype=np.float64))
+    BQ = B @ Q
+    chains = [BQ]
+    if max_hops == 1:
+        return chains
+
+    B2 = B @ B
+    B_BT = B * _swap(B)
+    chains.append(
+        B2 @ Q
+        - B * _diagonal(BQ)[..., None, :]
+        - Q * _diagonal(B2)[..., :, None]
+        + B_BT * Q
+    )
+    if max_hops == 2:
+        return chains
+
+    # i -> a -> b -> c -> j with a != j, c != i, then b not in {i, j}
+    chains.append(
+        B2 @ BQ
+        - B * _diagonal(B @ BQ)[..., None, :]
+        - Q * _diagonal(B2 @ B)[..., :, None]
+        + B * Q * _swap(B2)
+        - (_diagonal(B2)[..., :, None] - B_BT) * BQ
+        - B2 * (_diagonal(BQ)[..., None, :] - _swap(B) * Q)
+    )
+    return chains
+
+def transitive_points(beat, lost, common_counts, max_hops=3, decay=0.5):
+    """Get (points, hops) comparing every pair through the shortest informative chains.
+
+    Pairs with common opponents keep their common-opponent points (hops=1).
+    Other pairs fall back to chains through 2, then 3 opponents, taking
+    the first length with a chain in either direction and weighting its
+    counts by decay ** (hops - 1). hops is 0 for pairs with no connection.
+    """
+    chains = chain_counts(beat, lost, max_hops)
+    points = np.where(common_counts > 0, chains[0], 0.0)
+    hops = np.where(common_counts > 0, 1, 0)
+    # A team is never compared with itself
+    other = ~np.eye(points.shape[-1], dtype=bool)
+    for k, counts in enumerate(chains[1:], 2):
+        found = other & (hops == 0) & ((counts + _swap(counts)) > 0)
+        points = np.where(found, decay ** (k - 1) * counts, points)
+        hops = np.where(found, k, hops)
+    return points, hops
+
+def _number(x):
+    """Get an int for whole points, else a float rounded for display."""
+    x = float(x)
+    return int(x) if x.is_integer() else round(x, 3)
+
+def rank_teams(teams, points, compared=None):
+    """Get [(team, score, comparisons, avg)] ranked as nfl-scores.py ranks them.
+
+    compared holds each team's number of comparisons (default: every other team).
+    """
+    return rank_scores(teams, points.sum(axis=1), compared)
+
+def rank_scores(teams, scores, compared=None):
+    """Get [(team, score, comparisons, avg)] from each team's total points (see rank_teams)."""
+    if compared is None:
+        compared = np.full(len(teams), len(teams) - 1)
+    average = lambda i: _number(scores[i]) / compared[i] if compared[i] > 0 else 0
+    ranked = sorted(range(len(teams)), key=average, reverse=True)
+    return [(teams[i], _number(scores[i]), int(compared[i]), average(i)) for i in ranked]
+
+class CommonOpponentEngine:
+    """Compare every pair of teams on common opponents in one batch.
+
+    Each team's results are reduced to two indicator matrices, beat[i, o]
+    and lost[i, o]. Team i earns a point over team j for every common
+    opponent o it beat while j lost to o, so the full points table is the
+    single matrix product beat @ lost.T, and the number of common opponents
+    is played @ played.T.
+
+    rule='any' matches nfl-scores.py / check_data.py (a team "beat" an
+    opponent if it won any of their games). rule='last' matches
+    run_predictor.py (only the most recent meeting counts).
+
+    max_hops > 1 turns on the transitive mode: pairs without common
+    opponents are compared through chains of 2 or 3 opponents (see
+    transitive_points), and self.hops holds the chain length used.
+    """
+
+    def __init__(self, index, rule='any', max_hops=1, decay=0.5):
+        self.index = index
+        self.rule = rule
+        self.max_hops = max_hops
+        self.teams = list(index.teams)
+        with instrumentation.span('common_opponent_engine'):
+            self.points, self.common_counts = common_opponent_points(
+                index.wins_matrix, index.last_result_matrix, rule
+            )
+            self.hops = None
+            if max_hops > 1:
+                beat, lost, _ = result_indicators(index.wins_matrix, index.last_result_matrix, rule)
+                self.points, self.hops = transitive_points(
+                    beat, lost, self.common_counts, max_hops, decay
+                )
+        instrumentation.count('pairs_evaluated', len(self.teams) * (len(self.teams) - 1) // 2)
+
+    def get_pair_points(self, team1, team2):
+        """Get (team1_points, team2_points) for a single pair."""
+        i = self.index.team_ids[team1]
+        j = self.index.team_ids[team2]
+        return _number(self.points[i, j]), _number(self.points[j, i])
+
+    def get_common_count(self, team1, team2):
+        """Get number of common opponents for a single pair."""
+        return int(self.common_counts[self.index.team_ids[team1], self.index.team_ids[team2]])
+
+    def iter_pairs(self, min_common=0):
+        """Yield (team1, team2, team1_points, team2_points, common) for each pair in team order."""
+        rows, cols = np.triu_indices(len(self.teams), k=1)
+        keep = self.common_counts[rows, cols] >= min_common
+        if self.hops is not None:
+            # Pairs short of common opponents can still be compared through chains
+            keep |= self.hops[rows, cols] > 1
+        for i, j in zip(rows[keep], cols[keep]):
+            yield (
+                self.teams[i], self.teams[j],
+                _number(self.points[i, j]), _number(self.points[j, i]),
+                int(self.common_counts[i, j])
+            )
+
+    def _compared(self):
+        """Get each team's number of comparisons (connected pairs in transitive mode)."""
+        if self.hops is None:
+            return np.full(len(self.teams), len(self.teams) - 1)
+        return (self.hops > 0).sum(axis=1)
+
+    def get_team_scores(self):
+        """Get total points and number of comparisons for every team."""
+        scores = self.points.sum(axis=1)
+        compared = self._compared()
+        team_scores = {team: _number(scores[i]) for i, team in enumerate(self.teams)}
+        games_compared = {team: int(compared[i]) for i, team in enumerate(self.teams)}
+        return team_scores, games_compared
+
+    def get_rankings(self):
+        """Get teams ranked by average points per comparison, as nfl-scores.py ranks them."""
+        return [team for team, _, _, _ in rank_teams(self.teams, self.points, self._compared())]
@@ -0,0 +1,165 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import lxml.html
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+_TABLE_END = re.compile(r'</table\s*>', re.IGNORECASE)
+
+def _decode(html):
+    if isinstance(html, bytes):
+        return html.decode('utf-8', errors='replace')
+    return html
+
+def find_table_html(html, table_id):
+    """Get the markup of <table id=table_id>, or None.
+
+    The raw text is searched rather than a parsed tree, so tables that PFR
+    ships inside HTML comments (<!-- <table id="passing"> ... -->) are
+    found the same way as visible ones.
+    """
+    html = _decode(html)
+    start = re.search(
+        r'<table\b[^>]*\bid\s*=\s*["\']%s["\']' % re.escape(table_id), html, re.IGNORECASE
+    )
+    if start is None:
+        return None
+    end = _TABLE_END.search(html, start.end())
+    if end is None:
+        return None
+    return html[start.start():end.end()]
+
+def _header_row(table):
+    """Get the last <thead> row, or the first row of a table without <thead>."""
+    rows = table.xpath('./thead/tr') or table.xpath('./tbody/tr|./tr')[:1]
+    return rows[-1] if rows else None
+
+def _header(row, data_stat):
+    """Get column names from a header row, named as pd.read_html names them."""
+    if row is None:
+        return []
+    names = []
+    for i, cell in enumerate(row.xpath('./th|./td')):
+        name = cell.get('data-stat') if data_stat else cell.text_content().strip()
+        names.append(name or f'Unnamed: {i}')
+
+    # Repeated names get .1, .2, ... suffixes
+    seen = {}
+    for i, name in enumerate(names):
+        if name in seen:
+            seen[name] += 1
+            names[i] = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+    return names
+
+def _typed(values):
+    """Turn a column of cell strings into int, float or string values.
+
+    Thousands separators are dropped ("4,624" is 4624), and whole numbers
+    with blank cells become a nullable Int64 column rather than float, so
+    they are written back as "21" and not "21.0".
+    """
+    try:
+        numbers = np.array([float(v.replace(',', '')) if v != '' else np.nan for v in values], dtype=np.float64)
+    except ValueError:
+        return np.array([v if v != '' else np.nan for v in values], dtype=object)
+    blank = np.isnan(numbers)
+    filled = numbers[~blank]
+    if not len(filled) or (filled != np.round(filled)).any():
+        return numbers
+    if not blank.any():
+        return numbers.astype(np.int64)
+    return pd.arrays.IntegerArray(np.where(blank, 0, numbers).astype(np.int64), blank)
+
+def parse_table(table_html, data_stat=False):
+    """Get a DataFrame from the markup of one table.
+
+    Body and footer rows become typed columns directly; repeated header
+    rows inside the body (class "thead") are skipped. With data_stat=True
+    columns are named by PFR's data-stat attributes instead of header text.
+    """
+    table = lxml.html.fragment_fromstring(table_html)
+    header_row = _header_row(table)
+    columns = _header(header_row, data_stat)
+    cells = [[] for _ in columns]
+    for row in table.xpath('./tbody/tr|./tfoot/tr|./tr'):
+        if row is header_row or 'thead' in (row.get('class') or '').split():
+            continue
+        texts = [cell.text_content().strip() for cell in row.xpath('./th|./td')]
+        if not texts:
+            continue
+        texts += [''] * (len(columns) - len(texts))
+        for column, text in zip(cells, texts):
+            column.append(text)
+
+    instrumentation.count('rows_parsed', len(cells[0]) if cells else 0)
+    return pd.DataFrame({name: _typed(values) for name, values in zip(columns, cells)})
+
+def extract_table(html, table_id, data_stat=False):
+    """Get <table id=table_id> from a page as a DataFrame, or None if it is missing."""
+    with instrumentation.span('extract_table'):
+        table_html = find_table_html(html, table_id)
+        if table_html is None:
+            return None
+        return parse_table(table_html, data_stat)
+
+def extract_tables(html, table_ids, data_stat=False):
+    """Get {table_id: DataFrame or None} for several tables of one page."""
+    html = _decode(html)
+    return {table_id: extract_table(html, table_id, data_stat) for table_id in table_ids}
+
+def _extract_file(task):
+    path, table_ids, data_stat = task
+    with open(path, 'rb') as f:
+        return path, extract_tables(f.read(), table_ids, data_stat)
+
+def extract_tables_from_files(paths, table_ids, workers=None, data_stat=False):
+    """Get {path: {table_id: DataFrame or None}} for downloaded pages, parsed across processes."""
+    tasks = [(path, list(table_ids), data_stat) for path in paths]
+    if workers == 1 or len(tasks) <= 1:
+        return dict(map(_extract_file, tasks))
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_extract_file, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Extract tables (including commented-out ones) from saved PFR pages')
+    parser.add_argument('pages', nargs='+', help='Saved HTML pages')
+    parser.add_argument('--tables', nargs='+', required=True,
+                        help='Table ids to extract, e.g. games passing team_stats')
+    parser.add_argument('--output-dir',
+                        help='Write each table to <page>_<table>.csv in this directory')
+    parser.add_argument('--data-stat', action='store_true',
+                        help="Name columns by PFR's data-stat attributes")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per CPU)')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    results = extract_tables_from_files(args.pages, args.tables, args.workers, args.data_stat)
+    for path, tables in results.items():
+        for table_id, df in tables.items():
+            if df is None:
+                print(f"{path}: no table '{table_id}'")
+                continue
+            print(f"{path}: {table_id} has {len(df)} rows, {len(df.columns)} columns")
+            if args.output_dir:
+                page = os.path.splitext(os.path.basename(path))[0]
+                filename = os.path.join(args.output_dir, f'{page}_{table_id}.csv')
+                df.to_csv(filename, index=False)
+                print(f"Saved to: {filename}")
+
+if __name__ == "__main__":
+    main()
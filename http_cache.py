@@ -0,0 +1,195 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Version of the page parsing behind load_parsed/save_parsed (html_tables and
+# PFRScraper._scrape_game_scores); bump it whenever extraction changes so
+# frames parsed by older code are not served
+PARSER_VERSION = 3
+
+class CachedResponse:
+    """Response body served through ResponseCache."""
+
+    def __init__(self, url, content, digest, from_cache=False, not_modified=False):
+        self.url = url
+        self.content = content
+        self.digest = digest
+        self.from_cache = from_cache
+        self.not_modified = not_modified
+        self.status_code = 200
+
+class ResponseCache:
+    """Content-addressed on-disk cache of raw HTTP responses.
+
+    Bodies are stored once under objects/<sha256>; entries/<sha256(url)>.json
+    remembers which body a URL last returned along with its ETag and
+    Last-Modified headers so stale entries can be revalidated with a
+    conditional GET. Entries younger than ttl seconds are served without any
+    request. When the stored bodies exceed max_bytes the least recently used
+    entries are evicted. In offline mode only cached bodies are served.
+    """
+
+    def __init__(self, cache_dir, ttl=0, max_bytes=500 * 1024 * 1024, offline=False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.entries_dir = os.path.join(cache_dir, 'entries')
+        self.parsed_dir = os.path.join(cache_dir, 'parsed')
+        for directory in (self.objects_dir, self.entries_dir, self.parsed_dir):
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def _entry_path(self, url):
+        return os.path.join(self.entries_dir, hashlib.sha256(url.encode()).hexdigest() + '.json')
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest)
+
+    def _write_atomic(self, path, data, mode='wb'):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_entry(self, url):
+        path = self._entry_path(url)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            entry = json.load(f)
+        if not os.path.exists(self._object_path(entry['digest'])):
+            return None
+        return entry
+
+    def _write_entry(self, url, entry):
+        self._write_atomic(self._entry_path(url), json.dumps(entry), mode='w')
+
+    def _response(self, url, entry, **kwargs):
+        with open(self._object_path(entry['digest']), 'rb') as f:
+            content = f.read()
+        entry['used_at'] = time.time()
+        self._write_entry(url, entry)
+        return CachedResponse(url, content, entry['digest'], from_cache=True, **kwargs)
+
+    def lookup(self, url):
+        """Get a cached response that can be served without a request, else None."""
+        entry = self._read_entry(url)
+        if entry is None:
+            return None
+        if self.offline or time.time() - entry['fetched_at'] < self.ttl:
+            return self._response(url, entry)
+        return None
+
+    def conditional_headers(self, url):
+        """Get If-None-Match / If-Modified-Since headers for revalidating a URL."""
+        entry = self._read_entry(url)
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, url, response):
+        """Serve the cached body after a 304 Not Modified."""
+        entry = self._read_entry(url)
+        if entry is None:
+            raise ValueError(f"Got 304 for uncached URL: {url}")
+        entry['fetched_at'] = time.time()
+        entry['etag'] = response.headers.get('ETag', entry.get('etag'))
+        entry['last_modified'] = response.headers.get('Last-Modified', entry.get('last_modified'))
+        return self._response(url, entry, not_modified=True)
+
+    def store(self, url, response):
+        """Save a full response body and return it as a CachedResponse."""
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        now = time.time()
+        with self.lock:
+            if not os.path.exists(object_path):
+                self._write_atomic(object_path, content)
+            previous = self._read_entry(url)
+            self._write_entry(url, {
+                'url': url,
+                'digest': digest,
+                'size': len(content),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': now,
+                'used_at': now,
+            })
+            # A changed page leaves its old body behind unless another URL still uses it
+            if previous is not None and previous['digest'] != digest:
+                if not any(entry['digest'] == previous['digest'] for _, entry in self._entries()):
+                    self._drop_object(previous['digest'])
+        self.evict()
+        return CachedResponse(url, content, digest)
+
+    def _entries(self):
+        """Get [(path, entry)] for every stored URL."""
+        entries = []
+        for name in os.listdir(self.entries_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.entries_dir, name)
+            try:
+                with open(path) as f:
+                    entries.append((path, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def _drop_object(self, digest):
+        """Delete a body and the frames parsed from it."""
+        try:
+            os.remove(self._object_path(digest))
+        except FileNotFoundError:
+            pass
+        for name in os.listdir(self.parsed_dir):
+            if name.startswith(digest):
+                os.remove(os.path.join(self.parsed_dir, name))
+
+    def load_parsed(self, digest, name):
+        """Get a DataFrame previously parsed from a cached body, else None."""
+        path = os.path.join(self.parsed_dir, f"{digest}_{name}_v{PARSER_VERSION}.pkl")
+        if not os.path.exists(path):
+            return None
+        return pd.read_pickle(path)
+
+    def save_parsed(self, digest, name, df):
+        """Remember the DataFrame parsed from a cached body."""
+        path = os.path.join(self.parsed_dir, f"{digest}_{name}_v{PARSER_VERSION}.pkl")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Drop least recently used entries until stored bodies fit in max_bytes."""
+        with self.lock:
+            entries = self._entries()
+            sizes = {entry['digest']: entry['size'] for _, entry in entries}
+            total = sum(sizes.values())
+            if total <= self.max_bytes:
+                return
+            
+            refs = {}
+            for _, entry in entries:
+                refs[entry['digest']] = refs.get(entry['digest'], 0) + 1
+            
+            for path, entry in sorted(entries, key=lambda item: item[1]['used_at']):
+                if total <= self.max_bytes:
+                    break
+                os.remove(path)
+                digest = entry['digest']
+                refs[digest] -= 1
+                if refs[digest] == 0:
+                    total -= sizes[digest]
+                    self._drop_object(digest)
@@ -0,0 +1,125 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Set NFL_PROFILE=1 (or pass --profile to a script) to collect a trace.
+# NFL_PROFILE_OUTPUT names a JSON file for the summary (default: stderr).
+ENABLED = False
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_memory = []
+_started = time.perf_counter()
+_output = None
+
+class _NullSpan:
+    """Shared no-op span used while instrumentation is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            stats = _spans.setdefault(self.name, {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+            stats['count'] += 1
+            stats['total_s'] += elapsed
+            stats['max_s'] = max(stats['max_s'], elapsed)
+        return False
+
+def span(name):
+    """Time a block: `with span('load_data'): ...`."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+def count(name, n=1):
+    """Add n to a counter."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def memory_snapshot(label):
+    """Record current and peak process memory under a label."""
+    if not ENABLED:
+        return
+    snapshot = {'label': label, 'elapsed_s': time.perf_counter() - _started}
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        snapshot['peak_rss_mb'] = peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+    try:
+        with open('/proc/self/statm') as f:
+            snapshot['rss_mb'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    with _lock:
+        _memory.append(snapshot)
+
+def summary():
+    """Get the collected spans, counters and memory snapshots."""
+    with _lock:
+        return {
+            'wall_time_s': time.perf_counter() - _started,
+            'spans': {name: dict(stats) for name, stats in _spans.items()},
+            'counters': dict(_counters),
+            'memory': list(_memory),
+        }
+
+def write_summary():
+    """Write the summary as JSON to the output file, or to stderr."""
+    if not ENABLED:
+        return
+    memory_snapshot('exit')
+    data = json.dumps(summary(), indent=2)
+    if _output:
+        with open(_output, 'w') as f:
+            f.write(data + '\n')
+        print(f"Profile written to: {_output}", file=sys.stderr)
+    else:
+        print(data, file=sys.stderr)
+
+def enable(output=None):
+    """Turn instrumentation on and dump a summary when the process exits."""
+    global ENABLED, _output
+    if output is not None:
+        _output = output
+    if not ENABLED:
+        ENABLED = True
+        atexit.register(write_summary)
+
+def add_profile_argument(parser):
+    """Add the shared --profile [PATH] option to an argparse parser."""
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='PATH',
+                        help='Collect a timing/counter trace; write JSON to PATH (default: stderr)')
+
+def enable_from_args(args):
+    """Enable instrumentation if --profile was passed."""
+    if getattr(args, 'profile', None) is not None:
+        enable(args.profile or None)
+
+if os.environ.get('NFL_PROFILE', '') not in ('', '0'):
+    enable(os.environ.get('NFL_PROFILE_OUTPUT') or None)
@@ -0,0 +1,114 @@
+import csv
+import json
+
+RECORD_FIELDS = ['team1', 'team2', 'team1_points', 'team2_points', 'common_opponents', 'prediction']
+
+# Extra field of transitive-mode records: opponents per chain (1 = common opponents)
+TRANSITIVE_FIELDS = RECORD_FIELDS + ['hops']
+
+def get_prediction(team1, team2, team1_points, team2_points):
+    """Get prediction text from common opponent points"""
+    if team1_points > team2_points:
+        return f"{team1} predicted to win (+{round(team1_points-team2_points, 3)} points)"
+    elif team2_points > team1_points:
+        return f"{team2} predicted to win (+{round(team2_points-team1_points, 3)} points)"
+    else:
+        return "Even matchup"
+
+def iter_matchups(index, rule='last', min_common=1, max_hops=1, decay=0.5):
+    """Yield one compact result record per pair, as the pairs are scored.
+
+    With max_hops > 1, pairs without common opponents are compared through
+    chains of opponents and records carry the chain length in 'hops'.
+    """
+    # Imported here so get_prediction stays numpy-free for nfl_cli.py lookups
+    from common_opponents import CommonOpponentEngine
+
+    engine = CommonOpponentEngine(index, rule=rule, max_hops=max_hops, decay=decay)
+    ids = index.team_ids
+    for team1, team2, team1_points, team2_points, common in engine.iter_pairs(min_common):
+        record = {
+            'team1': team1,
+            'team2': team2,
+            'team1_points': team1_points,
+            'team2_points': team2_points,
+            'common_opponents': common,
+            'prediction': get_prediction(team1, team2, team1_points, team2_points)
+        }
+        if engine.hops is not None:
+            record['hops'] = int(engine.hops[ids[team1], ids[team2]])
+        yield record
+
+class JsonlSink:
+    """Write each record as one JSON line."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+class CsvSink:
+    """Write records as CSV rows under a header line."""
+
+    def __init__(self, stream, fieldnames=RECORD_FIELDS):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=fieldnames)
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow(record)
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+class TextSink:
+    """Human-readable output.
+
+    With render, each record's explanation is rendered (lazily, one record
+    at a time) and printed as it arrives, followed by the summary lines at
+    the end. Without it, summary lines are printed as records arrive.
+    """
+
+    def __init__(self, stream, render=None):
+        self.stream = stream
+        self.render = render
+        self.summary = []
+        if render is None:
+            self._write_summary_header()
+
+    def _write_summary_header(self):
+        self.stream.write("\nSummary of Predictions:\n")
+        self.stream.write("=====================\n")
+
+    def write(self, record):
+        line = f"{record['team1']} vs {record['team2']}: {record['prediction']}\n"
+        if self.render is None:
+            self.stream.write(line)
+            return
+        self.stream.write(self.render(record) + '\n')
+        self.summary.append(line)
+
+    def close(self):
+        if self.render is not None:
+            self._write_summary_header()
+            self.stream.writelines(self.summary)
+        self.stream.flush()
+
+SINKS = {'text': TextSink, 'jsonl': JsonlSink, 'csv': CsvSink}
+
+def write_matchups(records, sink):
+    """Stream records into a sink; returns the number written."""
+    count = 0
+    try:
+        for record in records:
+            sink.write(record)
+            count += 1
+    finally:
+        sink.close()
+    return count
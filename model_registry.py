@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+VERSION_PATTERN = re.compile(r'^v(\d{4,})$')
+
+class ModelRegistry:
+    """Versioned on-disk store of NFLPredictor checkpoints.
+
+    Each version is a directory root/vNNNN holding model.keras, scaler.pkl,
+    metadata.json and inference.npz (for NFLInference). Versions are
+    written to a temporary directory and renamed into place, so a reader
+    never sees a half-written checkpoint.
+    """
+
+    def __init__(self, root='models'):
+        self.root = root
+
+    def versions(self):
+        """Get the saved version numbers, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in os.listdir(self.root):
+            match = VERSION_PATTERN.match(name)
+            if match and os.path.isdir(os.path.join(self.root, name)):
+                found.append(int(match.group(1)))
+        return sorted(found)
+
+    def latest(self):
+        """Get the newest version number, or None if nothing is saved."""
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def path(self, version=None):
+        """Get the directory of a version (default: latest)."""
+        if version is None:
+            version = self.latest()
+            if version is None:
+                raise FileNotFoundError(f"No models saved in {self.root}")
+        return os.path.join(self.root, f'v{version:04d}')
+
+    def save(self, predictor, **metadata):
+        """Save a predictor as the next version; returns the version number.
+
+        Extra keyword arguments (seasons, last_game_date, ...) are stored in
+        the version's metadata next to the training details.
+        """
+        version = (self.latest() or 0) + 1
+        predictor.metadata.update(metadata)
+        predictor.metadata['version'] = version
+
+        os.makedirs(self.root, exist_ok=True)
+        final_dir = self.path(version)
+        tmp_dir = final_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        predictor.save(tmp_dir)
+        predictor.export_model(os.path.join(tmp_dir, 'inference.npz'))
+        os.replace(tmp_dir, final_dir)
+        print(f"Saved model version {version} to: {final_dir}")
+        return version
+
+    def load(self, version=None):
+        """Load a version (default: latest) as an NFLPredictor."""
+        from nfl_predictor import NFLPredictor
+
+        with instrumentation.span('load_model'):
+            return NFLPredictor.load(self.path(version))
+
+    def metadata(self, version=None):
+        """Get a version's metadata without loading the model."""
+        with open(os.path.join(self.path(version), 'metadata.json')) as f:
+            return json.load(f)
+
+def training_data(games_df, n_games=5, min_games=0):
+    """Get (X, y, game dates) for every completed game in games_df."""
+    from nfl_features import TeamFeatureBuilder
+
+    X, y, rows = TeamFeatureBuilder(games_df, n_games).build_training_set(min_games)
+    dates = pd.to_datetime(games_df['date']).to_numpy()[rows]
+    return X, y, dates
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Train, fine-tune and list versioned NFLPredictor models')
+    parser.add_argument('command', choices=['list', 'train', 'fine-tune'])
+    parser.add_argument('first_season', type=int, nargs='?', default=2023)
+    parser.add_argument('last_season', type=int, nargs='?', default=None)
+    parser.add_argument('--registry', default='models',
+                        help='Registry directory (default: models)')
+    parser.add_argument('--version', type=int, default=None,
+                        help='Version to fine-tune from (default: latest)')
+    parser.add_argument('--epochs', type=int, default=None,
+                        help='Epochs (default: 50 for train, 20 for fine-tune)')
+    parser.add_argument('--patience', type=int, default=3,
+                        help='Early-stopping patience for fine-tune')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    from nfl_data_prep import NFLDataPreprocessor
+    from nfl_predictor import NFLPredictor
+
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    registry = ModelRegistry(args.registry)
+
+    if args.command == 'list':
+        for version in registry.versions():
+            meta = registry.metadata(version)
+            val = meta.get('val_accuracy')
+            print(f"v{version:04d} {meta.get('mode', '?'):<9} {meta.get('trained_at', '')} "
+                  f"samples {meta.get('samples', 0):>5} epochs {meta.get('epochs_run', 0):>3} "
+                  f"val_acc {val if val is None else f'{val:.4f}'} last game {meta.get('last_game_date')}")
+        return
+
+    last_season = args.last_season if args.last_season is not None else args.first_season
+    preprocessor = NFLDataPreprocessor()
+    if not preprocessor.load_data(range(args.first_season, last_season + 1)):
+        print("Failed to load data")
+        return
+    X, y, dates = training_data(preprocessor.games_df)
+    if len(X) == 0:
+        print("No completed games to train on")
+        return
+    seasons = [args.first_season, last_season]
+
+    if args.command == 'train':
+        predictor = NFLPredictor()
+        predictor.train(X, y, epochs=args.epochs or 50)
+        registry.save(predictor, parent=None, seasons=seasons, last_game_date=str(dates.max()))
+        return
+
+    # Fine-tune: only games played after the checkpoint's last game
+    predictor = registry.load(args.version)
+    parent = predictor.metadata.get('version')
+    last_trained = np.datetime64(predictor.metadata['last_game_date'])
+    new = dates > last_trained
+    if not new.any():
+        print(f"No games after {predictor.metadata['last_game_date']}; nothing to fine-tune")
+        return
+    predictor.fine_tune(X[new], y[new], epochs=args.epochs or 20, patience=args.patience)
+    registry.save(predictor, parent=parent, seasons=seasons, last_game_date=str(dates[new].max()))
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-from nfl_data_prep import NFLDataPreprocessor
+from nfl_data_prep import NFLDataPreprocessor, TeamIndex
+from common_opponents import CommonOpponentEngine
+import instrumentation
+import argparse
 
-def get_all_teams(games_df):
+def get_all_teams(games_df, index=None):
     """Get list of all teams"""
+    if index is not None:
+        return list(index.teams)
     teams = set()
     for team in games_df['winner'].unique():
         teams.add(team)
@@ -9,55 +14,26 @@ def get_all_teams(games_df):
         teams.add(team)
     return sorted(list(teams))
 
-def analyze_team_performance(games_df, team1, team2):
+def analyze_team_performance(games_df, team1, team2, index=None):
     """Compare two teams based on common opponents"""
+    instrumentation.count('pairs_evaluated')
+    if index is None:
+        index = TeamIndex(games_df)
+    
     team1_points = 0
     team2_points = 0
     
-    # Get results for each team
-    team1_games = games_df[
-        (games_df['winner'] == team1) | (games_df['loser'] == team1)
-    ]
-    team2_games = games_df[
-        (games_df['winner'] == team2) | (games_df['loser'] == team2)
-    ]
-    
     # Get opponents for each team
-    team1_opponents = set()
-    team2_opponents = set()
-    
-    for _, game in team1_games.iterrows():
-        if game['winner'] == team1:
-            team1_opponents.add(game['loser'])
-        else:
-            team1_opponents.add(game['winner'])
-            
-    for _, game in team2_games.iterrows():
-        if game['winner'] == team2:
-            team2_opponents.add(game['loser'])
-        else:
-            team2_opponents.add(game['winner'])
+    team1_opponents = index.get_opponents(team1)
+    team2_opponents = index.get_opponents(team2)
             
     # Find common opponents
     common_opponents = team1_opponents.intersection(team2_opponents) - {team1, team2}
     
     # For each common opponent
     for opponent in common_opponents:
-        team1_won = any(
-            game['winner'] == team1 
-            for _, game in team1_games[
-                (team1_games['winner'] == team1) & (team1_games['loser'] == opponent) |
-                (team1_games['winner'] == opponent) & (team1_games['loser'] == team1)
-            ].iterrows()
-        )
-        
-        team2_won = any(
-            game['winner'] == team2 
-            for _, game in team2_games[
-                (team2_games['winner'] == team2) & (team2_games['loser'] == opponent) |
-                (team2_games['winner'] == opponent) & (team2_games['loser'] == team2)
-            ].iterrows()
-        )
+        team1_won = index.has_beaten(team1, opponent)
+        team2_won = index.has_beaten(team2, opponent)
         
         if team1_won and not team2_won:
             team1_points += 1
@@ -66,7 +42,19 @@ def analyze_team_performance(games_df, team1, team2):
             
     return team1_points, team2_points
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rank teams by common opponent performance')
+    parser.add_argument('--max-hops', type=int, choices=[1, 2, 3], default=1,
+                        help='Compare pairs without common opponents through chains of up to this many opponents')
+    parser.add_argument('--decay', type=float, default=0.5,
+                        help='Weight multiplier per extra opponent in a chain (default: 0.5)')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    
     # Initialize preprocessor
     preprocessor = NFLDataPreprocessor()
     
@@ -75,34 +63,14 @@ def main():
         print("Failed to load data")
         return
     
-    # Get all teams
-    teams = get_all_teams(preprocessor.games_df)
-    
-    # Calculate scores for each team
-    team_scores = {team: 0 for team in teams}
-    games_compared = {team: 0 for team in teams}
-    
     print("\nCalculating scores based on common opponent performance...")
     
-    # Compare each team with every other team
-    for i, team1 in enumerate(teams):
-        for team2 in teams[i+1:]:
-            team1_points, team2_points = analyze_team_performance(
-                preprocessor.games_df, team1, team2
-            )
-            team_scores[team1] += team1_points
-            team_scores[team2] += team2_points
-            games_compared[team1] += 1
-            games_compared[team2] += 1
+    # Compare every team with every other team in one batch
+    engine = CommonOpponentEngine(preprocessor.index, rule='any', max_hops=args.max_hops, decay=args.decay)
+    team_scores, games_compared = engine.get_team_scores()
     
     # Sort teams by score
-    sorted_teams = sorted(
-        teams,
-        key=lambda x: (
-            team_scores[x] / games_compared[x] if games_compared[x] > 0 else 0
-        ),
-        reverse=True
-    )
+    sorted_teams = engine.get_rankings()
     
     print("\nFinal Team Rankings (based on common opponent performance):")
     print("========================================================")
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Only the standard library is imported here. Each subcommand imports what
+# it needs, so `--help` and cached lookups (h2h, common) never load numpy or
+# pandas, and nothing but `rank --method srs` / `predict --model` pulls in
+# more than numpy and pandas.
+
+# Game columns read from the season cache for lookups
+LOOKUP_COLUMNS = ['week', 'date', 'winner', 'loser', 'winner_pts', 'loser_pts']
+
+# Libraries the startup benchmark reports when a subcommand imports them
+HEAVY_MODULES = ['numpy', 'pandas', 'scipy', 'sklearn', 'tensorflow', 'matplotlib', 'requests', 'bs4', 'lxml']
+
+def load_games(seasons, data_dir='nfl_data'):
+    """Get {column: list} of completed games from the season cache, or None if there are none.
+
+    Uses only the standard library; a missing or stale cache is rebuilt
+    once through SeasonStore (which needs numpy and pandas).
+    """
+    from season_cache import cache_paths, cached_meta, read_columns
+
+    parts = []
+    for season in seasons:
+        csv_path = os.path.join(data_dir, f"nfl_{season}_games.csv")
+        if not os.path.exists(csv_path):
+            continue
+        npz_path, meta_path = cache_paths(os.path.join(data_dir, '.cache'), season)
+        if cached_meta(csv_path, meta_path) is None:
+            from season_store import SeasonStore
+            SeasonStore(data_dir).refresh(season)
+        parts.append(read_columns(npz_path, LOOKUP_COLUMNS))
+    if not parts:
+        return None
+
+    games = {column: [value for part in parts for value in part[column]] for column in LOOKUP_COLUMNS}
+    # Unplayed games have no score (None, or NaN in float columns)
+    played = [i for i, pts in enumerate(games['winner_pts']) if pts is not None and pts == pts]
+    order = sorted(played, key=lambda i: games['date'][i])
+    return {column: [values[i] for i in order] for column, values in games.items()}
+
+def team_results(games, team, rule='any'):
+    """Get {opponent: 'won' or 'lost'} for a team.
+
+    rule='any' counts any win over the opponent (nfl-scores.py, check_data.py);
+    rule='last' uses the most recent meeting (run_predictor.py).
+    """
+    results = {}
+    for winner, loser in zip(games['winner'], games['loser']):
+        if winner == team:
+            results[loser] = 'won'
+        elif loser == team and not (rule == 'any' and results.get(winner) == 'won'):
+            results[winner] = 'lost'
+    return results
+
+def _check_teams(games, teams):
+    known = set(games['winner']) | set(games['loser'])
+    unknown = [team for team in teams if team not in known]
+    for team in unknown:
+        print(f"Unknown team: {team}")
+    return not unknown
+
+def _game_line(games, i, team):
+    date = str(games['date'][i])[:10]
+    won = games['winner'][i] == team
+    score = f"{games['winner_pts'][i]:.0f}-{games['loser_pts'][i]:.0f}"
+    opponent = games['loser'][i] if won else games['winner'][i]
+    return f"{date} (week {games['week'][i]}): {team} {'WON' if won else 'LOST'} {score} vs {opponent}"
+
+def cmd_h2h(args):
+    games = load_games(args.seasons, args.data_dir)
+    if games is None or not _check_teams(games, [args.team1, args.team2]):
+        return 1
+    pair = {args.team1, args.team2}
+    meetings = [i for i in range(len(games['winner'])) if {games['winner'][i], games['loser'][i]} == pair]
+
+    print(f"\n{args.team1} vs {args.team2}: {len(meetings)} games")
+    for i in meetings:
+        print(_game_line(games, i, args.team1))
+    wins = sum(games['winner'][i] == args.team1 for i in meetings)
+    print(f"\nRecord: {args.team1} {wins}-{len(meetings) - wins} {args.team2}")
+
+def cmd_common(args):
+    from matchup_report import get_prediction
+
+    games = load_games(args.seasons, args.data_dir)
+    if games is None or not _check_teams(games, [args.team1, args.team2]):
+        return 1
+    team1_results = team_results(games, args.team1, args.rule)
+    team2_results = team_results(games, args.team2, args.rule)
+    common = sorted((set(team1_results) & set(team2_results)) - {args.team1, args.team2})
+
+    print(f"\nFound {len(common)} common opponents:")
+    team1_points = team2_points = 0
+    for opponent in common:
+        result1, result2 = team1_results[opponent], team2_results[opponent]
+        note = ""
+        if result1 == 'won' and result2 == 'lost':
+            team1_points += 1
+            note = f" -> {args.team1} +1"
+        elif result2 == 'won' and result1 == 'lost':
+            team2_points += 1
+            note = f" -> {args.team2} +1"
+        print(f"- {opponent}: {args.team1} {result1}, {args.team2} {result2}{note}")
+
+    print(f"\nFinal Score:")
+    print(f"{args.team1}: {team1_points} points")
+    print(f"{args.team2}: {team2_points} points")
+    print(f"\nPrediction: {get_prediction(args.team1, args.team2, team1_points, team2_points)}")
+
+def cmd_rank(args):
+    from nfl_data_prep import NFLDataPreprocessor
+
+    preprocessor = NFLDataPreprocessor(args.data_dir)
+    if not preprocessor.load_data(args.seasons):
+        print("Failed to load data")
+        return 1
+
+    if args.method == 'srs':
+        from rating_engine import RatingEngine, print_rankings
+        engine = RatingEngine(preprocessor.games_df, by_season=False)
+        print_rankings(None, engine.get_rankings())
+        return
+
+    from common_opponents import CommonOpponentEngine
+    engine = CommonOpponentEngine(preprocessor.index, rule='any', max_hops=args.max_hops)
+    team_scores, games_compared = engine.get_team_scores()
+    print("\nFinal Team Rankings (based on common opponent performance):")
+    print("========================================================")
+    for rank, team in enumerate(engine.get_rankings(), 1):
+        avg_score = team_scores[team] / games_compared[team] if games_compared[team] > 0 else 0
+        print(f"{rank}. {team:<30} Score: {team_scores[team]:>3} points in {games_compared[team]:>2} comparisons (Avg: {avg_score:.2f})")
+
+def _latest_model(registry):
+    """Get the inference.npz of a registry's newest version, or None."""
+    if not os.path.isdir(registry):
+        return None
+    # Version directories are vNNNN (see ModelRegistry); importing it would load pandas
+    versions = sorted(name for name in os.listdir(registry) if name[:1] == 'v' and name[1:].isdigit())
+    for name in sorted(versions, key=lambda name: int(name[1:]), reverse=True):
+        path = os.path.join(registry, name, 'inference.npz')
+        if os.path.exists(path):
+            return path
+    return None
+
+def cmd_predict(args):
+    model_path = args.model or _latest_model(args.registry)
+    if model_path is None:
+        # No trained model: fall back to the common-opponent rule of run_predictor.py
+        args.rule = 'last'
+        return cmd_common(args)
+
+    from nfl_data_prep import NFLDataPreprocessor
+    from nfl_features import TEAM_STATS, TeamFeatureBuilder
+    from nfl_inference import NFLInference
+
+    preprocessor = NFLDataPreprocessor(args.data_dir)
+    if not preprocessor.load_data(args.seasons):
+        print("Failed to load data")
+        return 1
+    model = NFLInference.load(model_path)
+    # The model was trained on TeamFeatureBuilder features for both teams
+    n_games = model.scaler_mean.shape[0] // 2 // len(TEAM_STATS)
+    histories = TeamFeatureBuilder(preprocessor.games_df, n_games).latest_state()
+    for team in (args.team1, args.team2):
+        if team not in histories:
+            print(f"Unknown team: {team}")
+            return 1
+
+    results = model.predict_games([(args.team1, args.team2)], team_histories=histories)
+    probability = float(results['symmetric_team1_win_probability'][0])
+    winner = args.team1 if probability > 0.5 else args.team2
+    print(f"\nModel: {model_path}")
+    print(f"{args.team1} win probability: {probability:.3f}")
+    print(f"{args.team2} win probability: {1 - probability:.3f}")
+    print(f"Prediction: {winner} predicted to win")
+
+def _imported_modules(command):
+    """Get the heavy top-level modules a command imports (via -X importtime)."""
+    run = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.abspath(__file__)] + command,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    names = {line.rsplit('|', 1)[-1].strip() for line in run.stderr.splitlines() if line.startswith('import time:')}
+    return [module for module in HEAVY_MODULES if module in names]
+
+def cmd_startup(args):
+    """Time each subcommand's start-to-exit in fresh interpreters."""
+    import statistics
+
+    team1, team2 = args.teams
+    # Lookups read the same seasons and data directory as the warm-up below
+    data = ['--seasons'] + [str(season) for season in args.seasons] + ['--data-dir', args.data_dir]
+    commands = {
+        'python -c pass': None,
+        '--help': ['--help'],
+        'scrape --help': ['scrape', '--help'],
+        'h2h': ['h2h', team1, team2] + data,
+        'common': ['common', team1, team2] + data,
+        'rank --help': ['rank', '--help'],
+        'rank': ['rank'] + data,
+        'predict': ['predict', team1, team2] + data,
+    }
+    if args.commands:
+        commands = {name: cmd for name, cmd in commands.items() if cmd is None or cmd[0] in args.commands}
+
+    # Warm the season cache and the OS file cache first
+    load_games(args.seasons, args.data_dir)
+
+    results = []
+    print(f"\n{'command':<16} {'median ms':>10} {'min ms':>8}  heavy imports")
+    for name, command in commands.items():
+        argv = [sys.executable, '-c', 'pass'] if command is None else [sys.executable, os.path.abspath(__file__)] + command
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            timings.append((time.perf_counter() - start) * 1000)
+        modules = _imported_modules(command) if command is not None else []
+        results.append({
+            'command': name, 'median_ms': statistics.median(timings), 'min_ms': min(timings),
+            'heavy_imports': modules,
+        })
+        print(f"{name:<16} {statistics.median(timings):>10.1f} {min(timings):>8.1f}  {', '.join(modules) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"\nSaved results to: {args.output}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='nfl_cli.py', description='NFL data, analysis and prediction tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_data_args(sub):
+        sub.add_argument('--seasons', nargs='+', type=int, default=[2023],
+                         help='Seasons to use (default: 2023)')
+        sub.add_argument('--data-dir', default='nfl_data')
+
+    # Handled by main(): everything after `scrape` goes to run_scraper.py
+    subparsers.add_parser('scrape', help='Scrape seasons from Pro Football Reference (run_scraper.py)')
+
+    h2h = subparsers.add_parser('h2h', help='Head-to-head games between two teams')
+    h2h.add_argument('team1')
+    h2h.add_argument('team2')
+    add_data_args(h2h)
+    h2h.set_defaults(func=cmd_h2h)
+
+    common = subparsers.add_parser('common', help='Compare two teams on common opponents (check_data.py)')
+    common.add_argument('team1')
+    common.add_argument('team2')
+    common.add_argument('--rule', choices=['any', 'last'], default='any',
+                        help="'any' as nfl-scores.py, 'last' as run_predictor.py")
+    add_data_args(common)
+    common.set_defaults(func=cmd_common)
+
+    rank = subparsers.add_parser('rank', help='Rank every team (nfl-scores.py)')
+    rank.add_argument('--method', choices=['common', 'srs'], default='common')
+    rank.add_argument('--max-hops', type=int, choices=[1, 2, 3], default=1,
+                      help='Transitive comparison depth for --method common')
+    add_data_args(rank)
+    rank.set_defaults(func=cmd_rank)
+
+    predict = subparsers.add_parser('predict', help='Predict a game with the latest model (or common opponents)')
+    predict.add_argument('team1')
+    predict.add_argument('team2')
+    predict.add_argument('--model', help='Model exported with NFLPredictor.export_model')
+    predict.add_argument('--registry', default='models',
+                         help='Model registry to take the latest version from (default: models)')
+    add_data_args(predict)
+    predict.set_defaults(func=cmd_predict)
+
+    startup = subparsers.add_parser('startup', help='Benchmark the startup time of each subcommand')
+    startup.add_argument('--repeats', type=int, default=5)
+    startup.add_argument('--teams', nargs=2, default=['Kansas City Chiefs', 'Baltimore Ravens'],
+                         help='Teams used for the lookup commands')
+    startup.add_argument('--commands', nargs='+',
+                         help='Only these subcommands (default: all)')
+    startup.add_argument('--output', help='JSON file to save results to')
+    add_data_args(startup)
+    startup.set_defaults(func=cmd_startup)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['scrape']:
+        import run_scraper
+        return run_scraper.main(argv[1:])
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
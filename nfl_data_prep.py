@@ -2,20 +2,264 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime
+from season_store import SeasonStore
+from nfl_features import TeamFeatureBuilder
+import instrumentation
+
+# Columns every games frame (and every appended batch) needs
+GAME_COLUMNS = ['date', 'winner', 'loser', 'winner_pts', 'loser_pts']
+
+def check_game_columns(games):
+    """Raise ValueError if a games frame lacks a required column."""
+    missing = [column for column in GAME_COLUMNS if column not in games.columns]
+    if missing:
+        raise ValueError(f"Missing game columns: {', '.join(missing)}")
+
+class TeamIndex:
+    """Integer-indexed lookup structure over a games DataFrame.
+
+    Teams are mapped to integer ids (alphabetical order) and every game row
+    is filed under both teams, so per-team and per-pair queries only touch
+    the handful of rows that involve those teams instead of re-scanning the
+    whole frame.
+    """
+
+    def __init__(self, games_df):
+        self.games_df = games_df
+
+        winners = games_df['winner'].to_numpy()
+        losers = games_df['loser'].to_numpy()
+
+        # Map team names to integer ids
+        self.teams = sorted(pd.unique(np.concatenate([winners, losers])).tolist())
+        self.team_ids = {team: i for i, team in enumerate(self.teams)}
+        n_teams = len(self.teams)
+
+        self.winner_ids = np.empty(0, dtype=np.int32)
+        self.loser_ids = np.empty(0, dtype=np.int32)
+        self.team_rows = np.empty(0, dtype=np.int64)
+        self.team_opponents = np.empty(0, dtype=np.int32)
+        self.team_won = np.empty(0, dtype=bool)
+        self.team_offsets = np.zeros(n_teams + 1, dtype=np.int64)
+        self.wins_matrix = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.losses_matrix = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.games_matrix = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.margin_matrix = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.last_result_matrix = np.zeros((n_teams, n_teams), dtype=np.int8)
+        self._last_rows = np.full((n_teams, n_teams), -1, dtype=np.int64)
+        self._add_games(games_df)
+
+    def _encode(self, teams):
+        return pd.Categorical(teams, categories=self.teams).codes.astype(np.int32)
+
+    def _add_games(self, new_games):
+        """File new rows (appended after the existing ones) and patch the matrices.
+
+        Only the new rows are sorted: their entries go at the end of their
+        teams' slices, and only their (winner, loser) cells of the result
+        matrices change. Every new array is computed before the index is
+        touched, so a bad batch leaves it unchanged.
+        """
+        check_game_columns(new_games)
+        n_teams = len(self.teams)
+        first_row = len(self.winner_ids)
+        new_winner_ids = self._encode(new_games['winner'].to_numpy())
+        new_loser_ids = self._encode(new_games['loser'].to_numpy())
+        winner_pts = pd.to_numeric(new_games['winner_pts'], errors='coerce').fillna(0).to_numpy()
+        loser_pts = pd.to_numeric(new_games['loser_pts'], errors='coerce').fillna(0).to_numpy()
+        margins = (winner_pts - loser_pts).astype(np.int64)
+        winner_ids = np.concatenate([self.winner_ids, new_winner_ids])
+        loser_ids = np.concatenate([self.loser_ids, new_loser_ids])
+
+        # File every new row under both of its teams, ordered by team then row
+        n_new = len(new_winner_ids)
+        rows = np.arange(first_row, first_row + n_new, dtype=np.int64)
+        entry_team = np.concatenate([new_winner_ids, new_loser_ids])
+        entry_opponent = np.concatenate([new_loser_ids, new_winner_ids])
+        entry_row = np.concatenate([rows, rows])
+        entry_won = np.concatenate([np.ones(n_new, dtype=bool), np.zeros(n_new, dtype=bool)])
+
+        # Rows only grow, so new entries go at the end of each team's slice
+        order = np.lexsort((entry_row, entry_team))
+        positions = self.team_offsets[entry_team[order] + 1]
+        team_rows = np.insert(self.team_rows, positions, entry_row[order])
+        team_opponents = np.insert(self.team_opponents, positions, entry_opponent[order])
+        team_won = np.insert(self.team_won, positions, entry_won[order])
+        team_offsets = self.team_offsets.copy()
+        team_offsets[1:] += np.cumsum(np.bincount(entry_team, minlength=n_teams))
+
+        # Nothing below can fail: swap in the new arrays, then patch the cells
+        self.winner_ids, self.loser_ids = winner_ids, loser_ids
+        self.team_rows, self.team_opponents, self.team_won = team_rows, team_opponents, team_won
+        self.team_offsets = team_offsets
+
+        # Dense team x team result matrices (row team's perspective)
+        np.add.at(self.wins_matrix, (new_winner_ids, new_loser_ids), 1)
+        np.add.at(self.losses_matrix, (new_loser_ids, new_winner_ids), 1)
+        np.add.at(self.games_matrix, (new_winner_ids, new_loser_ids), 1)
+        np.add.at(self.games_matrix, (new_loser_ids, new_winner_ids), 1)
+
+        np.add.at(self.margin_matrix, (new_winner_ids, new_loser_ids), margins)
+        np.subtract.at(self.margin_matrix, (new_loser_ids, new_winner_ids), margins)
+
+        # Result of the most recent meeting in row order: 1 won, -1 lost, 0 never played
+        np.maximum.at(self._last_rows, (new_winner_ids, new_loser_ids), rows)
+        np.maximum.at(self._last_rows, (new_loser_ids, new_winner_ids), rows)
+        last_rows = self._last_rows[entry_team, entry_opponent]
+        last_won = self.winner_ids[last_rows] == entry_team
+        self.last_result_matrix[entry_team, entry_opponent] = np.where(last_won, 1, -1)
+
+    def append_games(self, new_games):
+        """Add games appended to games_df, patching only the touched teams and matrix cells.
+
+        new_games must be the rows appended at the end of games_df, which is
+        itself re-concatenated (a DataFrame cannot grow in place). Returns
+        False (and leaves the index untouched) if they introduce a team the
+        index does not know, in which case it has to be rebuilt. Raises
+        ValueError, also leaving it untouched, if a game column is missing.
+        """
+        check_game_columns(new_games)
+        new_teams = set(new_games['winner']) | set(new_games['loser'])
+        if not new_teams <= set(self.team_ids):
+            return False
+        games_df = pd.concat([self.games_df, new_games], ignore_index=True)
+        self._add_games(new_games)
+        self.games_df = games_df
+        return True
+
+    def _team_slice(self, team):
+        team_id = self.team_ids[team]
+        return slice(self.team_offsets[team_id], self.team_offsets[team_id + 1])
+
+    def get_team_game_rows(self, team):
+        """Get positional row numbers of all games played by a team."""
+        if team not in self.team_ids:
+            return np.empty(0, dtype=np.int64)
+        return self.team_rows[self._team_slice(team)]
+
+    def get_head_to_head_rows(self, team1, team2):
+        """Get positional row numbers of games between two teams."""
+        if team1 not in self.team_ids or team2 not in self.team_ids:
+            return np.empty(0, dtype=np.int64)
+        team_slice = self._team_slice(team1)
+        opponents = self.team_opponents[team_slice]
+        return self.team_rows[team_slice][opponents == self.team_ids[team2]]
+
+    def get_head_to_head_games(self, team1, team2):
+        """Get games between two teams, sorted by date."""
+        rows = self.get_head_to_head_rows(team1, team2)
+        return self.games_df.iloc[rows].sort_values('date')
+
+    def get_opponents(self, team):
+        """Get the set of teams a team has played."""
+        if team not in self.team_ids:
+            return set()
+        opponent_ids = np.flatnonzero(self.games_matrix[self.team_ids[team]])
+        return {self.teams[i] for i in opponent_ids}
+
+    def get_result_vs(self, team, opponent):
+        """Get 'won'/'lost' for a team's most recent game against an opponent."""
+        if team not in self.team_ids or opponent not in self.team_ids:
+            return None
+        result = self.last_result_matrix[self.team_ids[team], self.team_ids[opponent]]
+        if result == 0:
+            return None
+        return 'won' if result > 0 else 'lost'
+
+    def get_team_results(self, team):
+        """Get {opponent: 'won'/'lost'} from a team's most recent game against each opponent."""
+        if team not in self.team_ids:
+            return {}
+        row = self.last_result_matrix[self.team_ids[team]]
+        return {
+            self.teams[i]: 'won' if row[i] > 0 else 'lost'
+            for i in np.flatnonzero(row)
+        }
+
+    def has_beaten(self, team, opponent):
+        """Check whether a team beat an opponent at least once."""
+        if team not in self.team_ids or opponent not in self.team_ids:
+            return False
+        return bool(self.wins_matrix[self.team_ids[team], self.team_ids[opponent]] > 0)
+
+    def get_record_vs(self, team, opponent):
+        """Get (wins, losses, point margin) of a team against an opponent."""
+        if team not in self.team_ids or opponent not in self.team_ids:
+            return 0, 0, 0
+        i, j = self.team_ids[team], self.team_ids[opponent]
+        return int(self.wins_matrix[i, j]), int(self.losses_matrix[i, j]), int(self.margin_matrix[i, j])
 
 class NFLDataPreprocessor:
-    def __init__(self, data_dir='nfl_data'):
+    def __init__(self, data_dir='nfl_data', cache_dir=None):
         self.data_dir = os.path.join(os.getcwd(), data_dir)
-        self.games_df = None
+        self.store = SeasonStore(self.data_dir, cache_dir)
+        self.seasons = []
+        self._games_df = None
+        self._index = None
+    
+    @property
+    def games_df(self):
+        """All loaded seasons as one frame, read from the cache on first access."""
+        if self._games_df is None and self.seasons:
+            self._games_df = self.store.get_seasons(self.seasons)
+        return self._games_df
     
-    def load_data(self):
-        """Load games data."""
+    @games_df.setter
+    def games_df(self, df):
+        self._games_df = df
+        self._index = None
+    
+    @property
+    def index(self):
+        """TeamIndex over games_df, built once on first access."""
+        if self._index is None and self.games_df is not None:
+            with instrumentation.span('build_team_index'):
+                self._index = TeamIndex(self.games_df)
+        return self._index
+    
+    def append_games(self, new_games):
+        """Append newly ingested games, updating the index in place when possible."""
+        check_game_columns(new_games)
+        if self.games_df is None:
+            self.games_df = new_games.reset_index(drop=True)
+            return
+        if self._index is not None and self._index.append_games(new_games):
+            self._games_df = self._index.games_df
+            return
+        self.games_df = pd.concat([self.games_df, new_games], ignore_index=True)
+    
+    def build_features(self, n_games=5):
+        """Get rolling previous-games features over the loaded games."""
+        if self.games_df is None:
+            print("No data loaded")
+            return None
+        return TeamFeatureBuilder(self.games_df, n_games)
+    
+    def get_season(self, season):
+        """Get a single season's games."""
+        return self.store.get_season(season)
+    
+    def load_data(self, seasons=None):
+        """Load games data for one or more seasons (default: 2023)."""
+        with instrumentation.span('load_data'):
+            loaded = self._load_data(seasons)
+        instrumentation.memory_snapshot('load_data')
+        return loaded
+    
+    def _load_data(self, seasons):
         try:
-            games_file = os.path.join(self.data_dir, 'nfl_2023_games.csv')
-            if os.path.exists(games_file):
-                self.games_df = pd.read_csv(games_file)
-                self.games_df['date'] = pd.to_datetime(self.games_df['date'])
-                print(f"Loaded {len(self.games_df)} games")
+            if seasons is None:
+                seasons = [2023]
+            elif isinstance(seasons, int):
+                seasons = [seasons]
+            
+            available = self.store.find_seasons(seasons)
+            if available:
+                # Refresh stale caches now; season frames are read lazily
+                self.seasons = available
+                self.games_df = None
+                n_games = sum(self.store.count_games(s) for s in available)
+                print(f"Loaded {n_games} games")
                 return True
             else:
                 print("Games file not found")
@@ -31,22 +275,15 @@ class NFLDataPreprocessor:
             return pd.DataFrame()
             
         # Find games between these teams
-        matches = self.games_df[
-            ((self.games_df['winner'] == team1) & (self.games_df['loser'] == team2)) |
-            ((self.games_df['winner'] == team2) & (self.games_df['loser'] == team1))
-        ].sort_values('date')
+        matches = self.index.get_head_to_head_games(team1, team2)
         
         print(f"\nHead-to-head history between {team1} and {team2}:")
         print(f"Total games found: {len(matches)}")
         
         if len(matches) > 0:
             print("\nMatch History:")
-            for _, game in matches.iterrows():
-                date = game['date'].strftime('%Y-%m-%d')
-                winner = game['winner']
-                loser = game['loser']
-                winner_pts = game['winner_pts']
-                loser_pts = game['loser_pts']
-                print(f"{date}: {winner} ({winner_pts}) def. {loser} ({loser_pts})")
+            for game in matches.itertuples(index=False):
+                date = game.date.strftime('%Y-%m-%d')
+                print(f"{date}: {game.winner} ({game.winner_pts}) def. {game.loser} ({game.loser_pts})")
                 
-        return matches
\ No newline at end of file
+        return matches
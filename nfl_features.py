@@ -0,0 +1,121 @@
+import pandas as pd
+import numpy as np
+
+# Per-game stats from each team's point of view
+TEAM_STATS = ['won', 'margin', 'yards_for', 'yards_against', 'turnovers', 'takeaways']
+
+class TeamFeatureBuilder:
+    """Rolling "previous games" features for NFLPredictor, built without look-ahead.
+
+    Every completed game is split into one entry per team, and the entries
+    are sorted once by (team, date, row). A team's features for a game are
+    its stats from its previous n_games entries in that order, most recent
+    first. They are zero-filled when the team has played fewer games. Each
+    lag is a shifted slice of the sorted arrays, so the whole table is built
+    in a single vectorized pass.
+    """
+
+    def __init__(self, games_df, n_games=5):
+        self.games_df = games_df
+        self.n_games = n_games
+        self.feature_names = [
+            f"{stat}_{lag}" for lag in range(1, n_games + 1) for stat in TEAM_STATS
+        ]
+        self._latest_state = None
+
+        # Only completed games carry results
+        winner_pts = pd.to_numeric(games_df['winner_pts'], errors='coerce')
+        loser_pts = pd.to_numeric(games_df['loser_pts'], errors='coerce')
+        completed = (winner_pts.notna() & loser_pts.notna()).to_numpy()
+        self.game_rows = np.flatnonzero(completed)
+        games = games_df.iloc[self.game_rows]
+        n = len(games)
+
+        def column(name):
+            return pd.to_numeric(games[name], errors='coerce').fillna(0).to_numpy(np.float64)
+
+        margin = column('winner_pts') - column('loser_pts')
+        winner_yards, loser_yards = column('winner_yards'), column('loser_yards')
+        winner_to, loser_to = column('winner_turnovers'), column('loser_turnovers')
+
+        # Entries 0..n-1 are winners, n..2n-1 are losers
+        self.winners = games['winner'].astype(str).to_numpy()
+        self.losers = games['loser'].astype(str).to_numpy()
+        entry_team = np.concatenate([self.winners, self.losers])
+        self.teams = sorted(set(entry_team))
+        team_codes = pd.Categorical(entry_team, categories=self.teams).codes
+        dates = pd.to_datetime(games['date']).to_numpy()
+        self.dates = dates
+        entry_date = np.concatenate([dates, dates])
+        entry_row = np.concatenate([np.arange(n), np.arange(n)])
+
+        stats = np.column_stack([
+            np.concatenate([np.ones(n), np.zeros(n)]),
+            np.concatenate([margin, -margin]),
+            np.concatenate([winner_yards, loser_yards]),
+            np.concatenate([loser_yards, winner_yards]),
+            np.concatenate([winner_to, loser_to]),
+            np.concatenate([loser_to, winner_to]),
+        ])
+
+        # Sort once by team, then date, then row
+        order = np.lexsort((entry_row, entry_date, team_codes))
+        self._sorted_stats = stats[order]
+        self._sorted_codes = team_codes[order]
+        counts = np.bincount(self._sorted_codes, minlength=len(self.teams))
+        self._team_ends = np.cumsum(counts)
+        self._team_starts = self._team_ends - counts
+        seq = np.arange(len(order)) - self._team_starts[self._sorted_codes]
+
+        # Lag k of each entry is the entry k places earlier within the same team
+        n_stats = len(TEAM_STATS)
+        sorted_history = np.zeros((len(order), n_games * n_stats))
+        for lag in range(1, n_games + 1):
+            valid = seq >= lag
+            sorted_history[valid, (lag - 1) * n_stats:lag * n_stats] = self._sorted_stats[np.flatnonzero(valid) - lag]
+        self._entry_history = np.empty_like(sorted_history)
+        self._entry_history[order] = sorted_history
+        self._entry_games_played = np.empty(len(order), dtype=np.int64)
+        self._entry_games_played[order] = seq
+
+        # Orient each game: team1 is the home team (alphabetical first at neutral sites)
+        if 'winner_site' in games.columns:
+            site = games['winner_site'].astype(str).to_numpy()
+        elif 'unnamed:_5' in games.columns:
+            site = np.where(games['unnamed:_5'].fillna('').astype(str) == '@', 'away', 'home')
+        else:
+            site = np.full(n, 'neutral')
+        winner_first = np.where(site == 'neutral', self.winners < self.losers, site != 'away')
+        self.team1_is_winner = winner_first
+
+    def build_training_set(self, min_games=0):
+        """Get aligned (X, y, rows) for NFLPredictor.train.
+
+        X holds team1's history followed by team2's; y is 1 when team1 won.
+        rows are the games' positions in games_df. Games where either team
+        has fewer than min_games previous games are skipped.
+        """
+        n = len(self.game_rows)
+        winner_history = self._entry_history[:n]
+        loser_history = self._entry_history[n:]
+        team1_first = self.team1_is_winner[:, None]
+        X = np.hstack([
+            np.where(team1_first, winner_history, loser_history),
+            np.where(team1_first, loser_history, winner_history),
+        ])
+        y = self.team1_is_winner.astype(np.int64)
+
+        keep = np.minimum(self._entry_games_played[:n], self._entry_games_played[n:]) >= min_games
+        return X[keep], y[keep], self.game_rows[keep]
+
+    def latest_state(self):
+        """Get {team: history vector} as of each team's most recent game (cached)."""
+        if self._latest_state is None:
+            n_stats = len(TEAM_STATS)
+            history = np.zeros((len(self.teams), self.n_games * n_stats))
+            for lag in range(1, self.n_games + 1):
+                idx = self._team_ends - lag
+                valid = idx >= self._team_starts
+                history[valid, (lag - 1) * n_stats:lag * n_stats] = self._sorted_stats[idx[valid]]
+            self._latest_state = {team: history[i] for i, team in enumerate(self.teams)}
+        return self._latest_state
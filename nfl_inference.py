@@ -0,0 +1,99 @@
+import numpy as np
+
+# Activations supported by the exported Dense layers
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'tanh': np.tanh,
+}
+
+def score_pairs(pairs, transform, forward, team_histories=None, both_orders=True):
+    """Score (team1, team2) pairs with one transform and one forward pass.
+
+    transform scales a feature matrix and forward maps it to one win
+    probability per row. Shared by NFLPredictor and NFLInference.
+    """
+    if team_histories is not None:
+        pairs = [(team_histories[team1], team_histories[team2]) for team1, team2 in pairs]
+    team1_histories = np.asarray([pair[0] for pair in pairs], dtype=np.float64)
+    team2_histories = np.asarray([pair[1] for pair in pairs], dtype=np.float64)
+    n_pairs = len(team1_histories)
+    
+    if n_pairs == 0:
+        # No pairs: the (0,) history arrays cannot be stacked or scaled
+        probabilities = np.empty(0, dtype=np.float32)
+    else:
+        # One feature matrix with every ordering to score
+        features = np.hstack([team1_histories, team2_histories])
+        if both_orders:
+            features = np.vstack([features, np.hstack([team2_histories, team1_histories])])
+        features = transform(features).astype(np.float32)
+        probabilities = forward(features)
+    team1_probability = probabilities[:n_pairs]
+    
+    results = {
+        'team1_win_probability': team1_probability,
+        'team2_win_probability': 1 - team1_probability,
+        'predicted_winner': np.where(team1_probability > 0.5, 'Team 1', 'Team 2')
+    }
+    if both_orders:
+        reversed_probability = probabilities[n_pairs:]
+        symmetric = (team1_probability + 1 - reversed_probability) / 2
+        results['reversed_team1_win_probability'] = 1 - reversed_probability
+        results['symmetric_team1_win_probability'] = symmetric
+        results['symmetric_predicted_winner'] = np.where(symmetric > 0.5, 'Team 1', 'Team 2')
+    return results
+
+class NFLInference:
+    """Pure-NumPy scorer for models exported with NFLPredictor.export_model.
+
+    Loads the Dense layer weights and the scaler statistics from one .npz
+    file and reproduces NFLPredictor.predict_game / predict_games without
+    importing TensorFlow or sklearn.
+    """
+
+    def __init__(self, layers, scaler_mean, scaler_scale):
+        self.layers = layers
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+
+    @classmethod
+    def load(cls, path):
+        """Load an exported model file."""
+        with np.load(path, allow_pickle=False) as data:
+            layers = []
+            for i in range(int(data['n_layers'])):
+                layers.append((
+                    data[f'layer{i}_kernel'].astype(np.float32),
+                    data[f'layer{i}_bias'].astype(np.float32),
+                    str(data[f'layer{i}_activation'])
+                ))
+            return cls(layers, data['scaler_mean'], data['scaler_scale'])
+
+    def transform(self, features):
+        """Scale features like the fitted StandardScaler."""
+        return (features - self.scaler_mean) / self.scaler_scale
+
+    def forward(self, features):
+        """Get the win probability for each row of scaled features."""
+        outputs = np.asarray(features, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            outputs = ACTIVATIONS[activation](outputs @ kernel + bias)
+        return outputs[:, 0]
+
+    def predict_game(self, team1_history, team2_history):
+        """Predict game outcome from team histories."""
+        features = np.concatenate([team1_history, team2_history])
+        features = self.transform(features.reshape(1, -1))
+        prediction = self.forward(features)[0]
+        
+        return {
+            'team1_win_probability': prediction,
+            'team2_win_probability': 1 - prediction,
+            'predicted_winner': 'Team 1' if prediction > 0.5 else 'Team 2'
+        }
+
+    def predict_games(self, pairs, team_histories=None, both_orders=True):
+        """Predict many games at once (see NFLPredictor.predict_games)."""
+        return score_pairs(pairs, self.transform, self.forward, team_histories, both_orders)
@@ -1,43 +1,67 @@
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout
-from tensorflow.keras.optimizers import Adam
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
+import json
+import os
+import pickle
+import time
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
+from nfl_inference import score_pairs
+import instrumentation
+
+# TensorFlow, sklearn and matplotlib are imported inside the methods that
+# need them, so scoring-only processes can stay on nfl_inference.NFLInference.
 
 class NFLPredictor:
-    def __init__(self):
+    def __init__(self, units=8, dropout=0.3, learning_rate=0.001):
+        from sklearn.preprocessing import StandardScaler
+        
+        # Hyperparameters used by build_model
+        self.units = units
+        self.dropout = dropout
+        self.learning_rate = learning_rate
         self.model = None
         self.scaler = StandardScaler()
         self.history = None
+        # Training details saved alongside the model (see save/ModelRegistry)
+        self.metadata = {}
     
-    def build_model(self, input_dim):
+    def build_model(self, input_dim, summary=True):
         """Build a simple neural network for win/loss prediction."""
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense, Dropout
+        from tensorflow.keras.optimizers import Adam
+        
         model = Sequential([
             # Input layer
-            Dense(8, activation='relu', input_dim=input_dim),
-            Dropout(0.3),
+            Dense(self.units, activation='relu', input_dim=input_dim),
+            Dropout(self.dropout),
             
             # Output layer
             Dense(1, activation='sigmoid')
         ])
         
         model.compile(
-            optimizer=Adam(learning_rate=0.001),
+            optimizer=Adam(learning_rate=self.learning_rate),
             loss='binary_crossentropy',
             metrics=['accuracy']
         )
         
-        print("\nModel Architecture:")
-        model.summary()
+        if summary:
+            print("\nModel Architecture:")
+            model.summary()
         
         return model
     
     def train(self, X, y, validation_split=0.2, epochs=50, batch_size=32):
         """Train the model."""
+        with instrumentation.span('train'):
+            history = self._train(X, y, validation_split, epochs, batch_size)
+        instrumentation.count('training_samples', len(X))
+        instrumentation.memory_snapshot('train')
+        return history
+    
+    def _train(self, X, y, validation_split, epochs, batch_size):
+        from sklearn.model_selection import train_test_split
+        
         # Scale features
         X_scaled = self.scaler.fit_transform(X)
         
@@ -58,6 +82,7 @@ class NFLPredictor:
             self.model = self.build_model(X.shape[1])
         
         # Train model
+        start = time.perf_counter()
         self.history = self.model.fit(
             X_train, y_train,
             validation_data=(X_val, y_val),
@@ -74,10 +99,125 @@ class NFLPredictor:
         print(f"Training - Loss: {train_loss:.4f}, Accuracy: {train_acc:.4f}")
         print(f"Validation - Loss: {val_loss:.4f}, Accuracy: {val_acc:.4f}")
         
+        self._record_run('train', len(X), len(self.history.epoch), time.perf_counter() - start,
+                         train_loss, train_acc, val_loss, val_acc)
         return self.history
     
+    def fine_tune(self, new_X, new_y, epochs=20, patience=3, validation_split=0.2,
+                  batch_size=32, validation_data=None):
+        """Continue training the current model on new games only, with early stopping.
+
+        The scaler is not re-fit: the weights were learned on its scale.
+        Validation uses validation_data if given, else a split of the new
+        games; the best epoch's weights are kept.
+        """
+        if self.model is None:
+            raise ValueError("Model needs to be trained or loaded first")
+        
+        with instrumentation.span('fine_tune'):
+            history = self._fine_tune(new_X, new_y, epochs, patience, validation_split,
+                                      batch_size, validation_data)
+        instrumentation.count('training_samples', len(new_X))
+        return history
+    
+    def _fine_tune(self, new_X, new_y, epochs, patience, validation_split, batch_size, validation_data):
+        from sklearn.model_selection import train_test_split
+        from tensorflow.keras.callbacks import EarlyStopping
+        
+        X_scaled = self.scaler.transform(new_X)
+        new_y = np.asarray(new_y)
+        if validation_data is not None:
+            X_train, y_train = X_scaled, new_y
+            X_val, y_val = self.scaler.transform(validation_data[0]), np.asarray(validation_data[1])
+        elif len(new_y) >= 10 and np.bincount(new_y, minlength=2).min() >= 2:
+            X_train, X_val, y_train, y_val = train_test_split(
+                X_scaled, new_y,
+                test_size=validation_split,
+                random_state=42,
+                stratify=new_y
+            )
+        else:
+            # Too few new games to hold any out
+            X_train, y_train, X_val, y_val = X_scaled, new_y, None, None
+        
+        print(f"\nFine-tuning on {len(X_train)} new games")
+        monitor = 'val_loss' if X_val is not None else 'loss'
+        start = time.perf_counter()
+        self.history = self.model.fit(
+            X_train, y_train,
+            validation_data=(X_val, y_val) if X_val is not None else None,
+            epochs=epochs,
+            batch_size=batch_size,
+            callbacks=[EarlyStopping(monitor=monitor, patience=patience, restore_best_weights=True)],
+            verbose=1
+        )
+        
+        train_loss, train_acc = self.model.evaluate(X_train, y_train, verbose=0)
+        val_loss, val_acc = (
+            self.model.evaluate(X_val, y_val, verbose=0) if X_val is not None else (None, None)
+        )
+        print(f"Stopped after {len(self.history.epoch)} epochs")
+        print(f"Training - Loss: {train_loss:.4f}, Accuracy: {train_acc:.4f}")
+        if val_acc is not None:
+            print(f"Validation - Loss: {val_loss:.4f}, Accuracy: {val_acc:.4f}")
+        
+        self._record_run('fine_tune', len(new_X), len(self.history.epoch), time.perf_counter() - start,
+                         train_loss, train_acc, val_loss, val_acc)
+        return self.history
+    
+    def _record_run(self, mode, samples, epochs, seconds, train_loss, train_acc, val_loss, val_acc):
+        """Update metadata with the latest training run."""
+        as_float = lambda x: float(x) if x is not None else None
+        self.metadata.update({
+            'mode': mode,
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'n_features': int(self.scaler.n_features_in_),
+            'units': self.units,
+            'dropout': self.dropout,
+            'learning_rate': self.learning_rate,
+            'samples': int(samples),
+            # A full train starts over; fine-tuning adds to what the model has seen
+            'total_samples': int(samples) + (self.metadata.get('total_samples', 0) if mode == 'fine_tune' else 0),
+            'epochs_run': int(epochs),
+            'train_seconds': round(seconds, 3),
+            'train_loss': as_float(train_loss),
+            'train_accuracy': as_float(train_acc),
+            'val_loss': as_float(val_loss),
+            'val_accuracy': as_float(val_acc),
+        })
+    
+    def save(self, directory):
+        """Save the model, fitted scaler and metadata into a directory."""
+        if self.model is None:
+            raise ValueError("Model needs to be trained first")
+        
+        os.makedirs(directory, exist_ok=True)
+        self.model.save(os.path.join(directory, 'model.keras'))
+        with open(os.path.join(directory, 'scaler.pkl'), 'wb') as f:
+            pickle.dump(self.scaler, f)
+        with open(os.path.join(directory, 'metadata.json'), 'w') as f:
+            json.dump(self.metadata, f, indent=2)
+    
+    @classmethod
+    def load(cls, directory):
+        """Load a predictor saved with save(), ready to predict or fine-tune."""
+        from tensorflow.keras.models import load_model
+        
+        predictor = cls()
+        predictor.model = load_model(os.path.join(directory, 'model.keras'))
+        with open(os.path.join(directory, 'scaler.pkl'), 'rb') as f:
+            predictor.scaler = pickle.load(f)
+        with open(os.path.join(directory, 'metadata.json')) as f:
+            predictor.metadata = json.load(f)
+        for name in ('units', 'dropout', 'learning_rate'):
+            if name in predictor.metadata:
+                setattr(predictor, name, predictor.metadata[name])
+        return predictor
+    
     def plot_training_history(self):
         """Plot training history."""
+        import matplotlib.pyplot as plt
+        
         if self.history is None:
             raise ValueError("Model hasn't been trained yet")
         
@@ -118,10 +258,70 @@ class NFLPredictor:
         features = self.scaler.transform(features.reshape(1, -1))
         
         # Make prediction
-        prediction = self.model.predict(features)[0][0]
+        with instrumentation.span('predict_game'):
+            prediction = self.model.predict(features)[0][0]
+        instrumentation.count('predictions')
         
         return {
             'team1_win_probability': prediction,
             'team2_win_probability': 1 - prediction,
             'predicted_winner': 'Team 1' if prediction > 0.5 else 'Team 2'
-        }
\ No newline at end of file
+        }
+    
+    def predict_games(self, pairs, team_histories=None, batch_size=1024, both_orders=True):
+        """Predict many games with a single scaled forward pass.
+
+        pairs is a sequence of (team1_history, team2_history) tuples, or of
+        (team1, team2) names when team_histories maps names to history
+        vectors. With both_orders, every pair is also scored with the teams
+        swapped in the same pass, and the two orderings are averaged into
+        symmetric_team1_win_probability.
+        """
+        if self.model is None:
+            raise ValueError("Model needs to be trained first")
+        
+        instrumentation.count('predictions', len(pairs))
+        with instrumentation.span('predict_games'):
+            return score_pairs(
+                pairs, self.scaler.transform,
+                lambda features: self._forward(features, batch_size),
+                team_histories, both_orders
+            )
+    
+    def _forward(self, features, batch_size):
+        """Run the model over fixed-size batches and return one probability per row."""
+        n_rows = len(features)
+        if n_rows == 0:
+            return np.empty(0, dtype=np.float32)
+        
+        # Pad to whole batches so every call has the same input shape
+        batch_size = min(batch_size, n_rows)
+        n_batches = -(-n_rows // batch_size)
+        padded = np.zeros((n_batches * batch_size, features.shape[1]), dtype=np.float32)
+        padded[:n_rows] = features
+        
+        outputs = [
+            np.asarray(self.model(padded[start:start + batch_size], training=False))
+            for start in range(0, len(padded), batch_size)
+        ]
+        return np.concatenate(outputs)[:n_rows, 0]
+    
+    def export_model(self, path):
+        """Save Dense layer weights and scaler statistics for NFLInference."""
+        if self.model is None:
+            raise ValueError("Model needs to be trained first")
+        
+        arrays = {}
+        dense_layers = [layer for layer in self.model.layers if layer.get_weights()]
+        for i, layer in enumerate(dense_layers):
+            kernel, bias = layer.get_weights()
+            arrays[f'layer{i}_kernel'] = kernel
+            arrays[f'layer{i}_bias'] = bias
+            arrays[f'layer{i}_activation'] = np.array(layer.get_config()['activation'])
+        arrays['n_layers'] = np.array(len(dense_layers))
+        arrays['scaler_mean'] = self.scaler.mean_
+        arrays['scaler_scale'] = self.scaler.scale_
+        
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+        print(f"Exported model to: {path}")
\ No newline at end of file
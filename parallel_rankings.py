@@ -0,0 +1,212 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+
+import numpy as np
+import pandas as pd
+
+from common_opponents import common_opponent_points, rank_teams
+import instrumentation
+
+# Game arrays shared with the workers, by name
+SHARED_COLUMNS = ['season', 'winner_id', 'loser_id']
+
+# Set in each worker by _attach_shared_games
+_shared = {}
+
+def _encode_games(games_df):
+    """Get (teams, {column: array}) with teams mapped to integer ids."""
+    winners = games_df['winner'].astype(str).to_numpy()
+    losers = games_df['loser'].astype(str).to_numpy()
+    teams = sorted(set(winners) | set(losers))
+    if 'season' in games_df.columns:
+        seasons = games_df['season'].to_numpy()
+    else:
+        # January/February games belong to the previous season
+        dates = pd.to_datetime(games_df['date'])
+        seasons = (dates.dt.year - (dates.dt.month < 3)).to_numpy()
+    return teams, {
+        # Scheduled games without a score yet, as in ScenarioEngine
+        'completed': pd.to_numeric(games_df['winner_pts'], errors='coerce').notna().to_numpy(),
+        'season': seasons.astype(np.int32),
+        'winner_id': pd.Categorical(winners, categories=teams).codes.astype(np.int32),
+        'loser_id': pd.Categorical(losers, categories=teams).codes.astype(np.int32),
+    }
+
+def _attach_shared_games(specs, teams):
+    """Pool initializer: map the shared game arrays without copying them."""
+    _shared['teams'] = teams
+    _shared['blocks'] = []
+    for column, (name, dtype, length) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _shared['blocks'].append(block)
+        _shared[column] = np.ndarray((length,), dtype=dtype, buffer=block.buf)
+    # Close the mappings when the worker shuts down
+    util.Finalize(None, _detach_shared_games, exitpriority=10)
+
+def _detach_shared_games():
+    """Drop the worker's views of the shared arrays and close its mappings."""
+    for column in SHARED_COLUMNS:
+        _shared.pop(column, None)
+    for block in _shared.pop('blocks', []):
+        block.close()
+
+def _attach_local(arrays, teams):
+    """Make the game arrays available to _rank_task in this process."""
+    _shared['teams'] = teams
+    for column in SHARED_COLUMNS:
+        _shared[column] = arrays[column]
+
+def _rank_task(task):
+    """Rank one season or scenario from the shared arrays."""
+    key, start, stop, flip, drop = task
+    teams = _shared['teams']
+    winner_ids = _shared['winner_id'][start:stop]
+    loser_ids = _shared['loser_id'][start:stop]
+    
+    # Apply the scenario's changes (positions within start:stop)
+    if len(flip):
+        winner_ids, loser_ids = winner_ids.copy(), loser_ids.copy()
+        winner_ids[flip], loser_ids[flip] = loser_ids[flip], winner_ids[flip]
+    if len(drop):
+        keep = np.ones(len(winner_ids), dtype=bool)
+        keep[drop] = False
+        winner_ids, loser_ids = winner_ids[keep], loser_ids[keep]
+    
+    # Rank only the teams that appear in this season
+    present = np.unique(np.concatenate([winner_ids, loser_ids]))
+    local = np.full(len(teams), -1, dtype=np.int64)
+    local[present] = np.arange(len(present))
+    wins_matrix = np.zeros((len(present), len(present)), dtype=np.int32)
+    np.add.at(wins_matrix, (local[winner_ids], local[loser_ids]), 1)
+    
+    points, _ = common_opponent_points(wins_matrix)
+    return key, rank_teams([teams[i] for i in present], points)
+
+class ParallelRanker:
+    """Common-opponent rankings for many seasons or scenarios on a process pool.
+
+    The encoded game arrays are sorted by season and copied once into
+    shared memory, and every worker maps them on start-up, so tasks only
+    carry a (start, stop) range and a few scenario row numbers. Each task
+    returns its ranking table, and tables are merged in task order, so
+    output does not depend on the worker count.
+    """
+
+    def __init__(self, games_df, workers=None):
+        self.games_df = games_df
+        self.workers = workers or os.cpu_count() or 1
+        self.teams, arrays = _encode_games(games_df)
+        
+        # Only completed games are shared, each season one contiguous range
+        completed = np.flatnonzero(arrays['completed'])
+        order = completed[np.argsort(arrays['season'][completed], kind='stable')]
+        self.arrays = {column: arrays[column][order] for column in SHARED_COLUMNS}
+        self.shared_position = np.full(len(games_df), -1, dtype=np.int64)
+        self.shared_position[order] = np.arange(len(order))
+
+    def _run(self, tasks):
+        if self.workers == 1:
+            _attach_local(self.arrays, self.teams)
+            results = [_rank_task(task) for task in tasks]
+        else:
+            blocks = []
+            specs = {}
+            try:
+                for column in SHARED_COLUMNS:
+                    array = self.arrays[column]
+                    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                    blocks.append(block)
+                    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+                    specs[column] = (block.name, array.dtype.str, len(array))
+                
+                with ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_attach_shared_games,
+                    initargs=(specs, self.teams)
+                ) as executor:
+                    results = list(executor.map(_rank_task, tasks, chunksize=max(1, len(tasks) // (4 * self.workers))))
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+        
+        # Merge into one table per season or scenario, in task order
+        tables = {}
+        for key, ranking in results:
+            tables[key] = pd.DataFrame(
+                [(rank, team, score, compared, avg) for rank, (team, score, compared, avg) in enumerate(ranking, 1)],
+                columns=['rank', 'team', 'score', 'comparisons', 'avg']
+            )
+        return tables
+
+    def rank_seasons(self, seasons=None):
+        """Get {season: ranking table} for each season."""
+        if seasons is None:
+            seasons = np.unique(self.arrays['season']).tolist()
+        tasks = [(int(s), *self._season_range(s), [], []) for s in seasons]
+        return self._run(tasks)
+
+    def _season_range(self, season):
+        """Get the (start, stop) range of a season in the shared arrays."""
+        season_column = self.arrays['season']
+        return (int(np.searchsorted(season_column, season, side='left')),
+                int(np.searchsorted(season_column, season, side='right')))
+
+    def rank_scenarios(self, scenarios, season=None):
+        """Get {name: ranking table} for what-if variants of one season.
+
+        scenarios maps a name to {'flip': [...], 'drop': [...]}, lists of
+        games_df row positions of completed games whose result is reversed
+        or that are removed.
+        """
+        if season is None:
+            start, stop = 0, len(self.arrays['season'])
+        else:
+            start, stop = self._season_range(season)
+        
+        def positions(rows):
+            shared = self.shared_position[np.asarray(rows, dtype=np.int64)]
+            positions = shared - start
+            if ((shared < 0) | (positions < 0) | (positions >= stop - start)).any():
+                raise ValueError(f"Scenario rows are not completed games of season {season}: {list(rows)}")
+            return positions
+        
+        tasks = []
+        for name, changes in scenarios.items():
+            tasks.append((name, start, stop, positions(changes.get('flip', [])), positions(changes.get('drop', []))))
+        return self._run(tasks)
+
+def print_rankings(key, table):
+    """Print a ranking table in the nfl-scores.py format."""
+    print(f"\nFinal Team Rankings for {key} (based on common opponent performance):")
+    print("========================================================")
+    for row in table.itertuples(index=False):
+        print(f"{row.rank}. {row.team:<30} Score: {row.score:>3} points in {row.comparisons:>2} comparisons (Avg: {row.avg:.2f})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Common-opponent rankings for many seasons in parallel')
+    parser.add_argument('first_season', type=int)
+    parser.add_argument('last_season', type=int)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per CPU)')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    from nfl_data_prep import NFLDataPreprocessor
+    
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    preprocessor = NFLDataPreprocessor()
+    if not preprocessor.load_data(range(args.first_season, args.last_season + 1)):
+        print("Failed to load data")
+        return
+    
+    ranker = ParallelRanker(preprocessor.games_df, workers=args.workers)
+    for season, table in ranker.rank_seasons().items():
+        print_rankings(season, table)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+PLAYER_KINDS = ['passing', 'rushing', 'receiving', 'defense', 'kicking']
+
+# Pro Football Reference team abbreviations -> names used in games_df
+TEAM_ABBREVIATIONS = {
+    'ARI': 'Arizona Cardinals', 'ATL': 'Atlanta Falcons', 'BAL': 'Baltimore Ravens',
+    'BUF': 'Buffalo Bills', 'CAR': 'Carolina Panthers', 'CHI': 'Chicago Bears',
+    'CIN': 'Cincinnati Bengals', 'CLE': 'Cleveland Browns', 'DAL': 'Dallas Cowboys',
+    'DEN': 'Denver Broncos', 'DET': 'Detroit Lions', 'GNB': 'Green Bay Packers',
+    'HOU': 'Houston Texans', 'IND': 'Indianapolis Colts', 'JAX': 'Jacksonville Jaguars',
+    'KAN': 'Kansas City Chiefs', 'LAC': 'Los Angeles Chargers', 'LAR': 'Los Angeles Rams',
+    'LVR': 'Las Vegas Raiders', 'MIA': 'Miami Dolphins', 'MIN': 'Minnesota Vikings',
+    'NOR': 'New Orleans Saints', 'NWE': 'New England Patriots', 'NYG': 'New York Giants',
+    'NYJ': 'New York Jets', 'PHI': 'Philadelphia Eagles', 'PIT': 'Pittsburgh Steelers',
+    'SEA': 'Seattle Seahawks', 'SFO': 'San Francisco 49ers', 'TAM': 'Tampa Bay Buccaneers',
+    'TEN': 'Tennessee Titans', 'WAS': 'Washington Commanders',
+    # Relocated franchises
+    'OAK': 'Oakland Raiders', 'SDG': 'San Diego Chargers', 'STL': 'St. Louis Rams',
+}
+
+# Columns that are rates or maxima and must not be summed into team totals
+NON_ADDITIVE = re.compile(r'(^rank$|^age$|^g$|^gs$|pct|/|lng|rate|qbr|avg)')
+
+# "2TM", "3TM": a player's season total across teams
+MULTI_TEAM = re.compile(r'^\d+TM$')
+
+def _normalize_columns(columns, kind):
+    """Strip the kind prefixes (receiving_receiving_yds -> yds) and unify names."""
+    renames = {'rk': 'rank', 'pos': 'position', 'games_g': 'g', 'games_gs': 'gs', 'yds.1': 'sk_yds'}
+    normalized = []
+    for column in columns:
+        name = column
+        while name.startswith(kind + '_'):
+            name = name[len(kind) + 1:]
+        normalized.append(renames.get(name, name))
+    return normalized
+
+def parse_player_table(df, kind):
+    """Parse one raw player CSV into compact typed columns.
+
+    Award markers are split off player names ('Brandon Aubrey*+' ->
+    'Brandon Aubrey', pro_bowl, all_pro), percent strings become floats,
+    QB records become wins/losses/ties, and "2TM"-style rows are flagged
+    as multi-team totals.
+    """
+    df = df.copy()
+    df.columns = _normalize_columns(df.columns, kind)
+    
+    names = df['player'].astype(str)
+    df['pro_bowl'] = names.str.contains('*', regex=False)
+    df['all_pro'] = names.str.contains('+', regex=False)
+    df['player'] = names.str.rstrip('*+').astype('category')
+    
+    team = df['team'].astype(str)
+    df['multi_team'] = team.str.match(MULTI_TEAM)
+    df['team'] = team.astype('category')
+    
+    if 'qbrec' in df.columns:
+        record = df['qbrec'].astype(str).str.extract(r'^(\d+)-(\d+)-(\d+)$')
+        for i, part in enumerate(['qb_wins', 'qb_losses', 'qb_ties']):
+            df[part] = pd.to_numeric(record[i], errors='coerce').astype(np.float32)
+        df = df.drop(columns=['qbrec'])
+    
+    for column in df.columns:
+        if column in ('player', 'team', 'multi_team', 'pro_bowl', 'all_pro'):
+            continue
+        if column in ('position', 'awards'):
+            df[column] = df[column].astype('category')
+            continue
+        values = df[column]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values.astype(str).str.rstrip('%'), errors='coerce')
+        df[column] = values.astype(np.float32)
+    return df
+
+def parse_team_stats(df):
+    """Parse the team standings CSV, dropping the repeated division header rows."""
+    df = df.copy()
+    
+    # Division header rows repeat the division name in every column
+    is_header = df['tm'] == df['w']
+    df['division'] = df['tm'].where(is_header).ffill()
+    df = df[~is_header]
+    
+    names = df['tm'].astype(str)
+    df['division_winner'] = names.str.endswith('*') | names.str.endswith('*+')
+    df['wild_card'] = names.str.contains('+', regex=False)
+    df['team'] = names.str.rstrip('*+')
+    df = df.drop(columns=['tm']).rename(columns={'w-l%': 'win_pct'})
+    
+    for column in df.columns:
+        if column in ('team', 'division', 'conference', 'division_winner', 'wild_card'):
+            continue
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype(np.float32)
+    df['division'] = df['division'].astype('category')
+    df['conference'] = df['conference'].astype('category')
+    return df.set_index('team')
+
+def latest_file(data_dir, season, kind):
+    """Get the most recent nfl_{season}_{kind}_*.csv snapshot, or None."""
+    files = sorted(glob.glob(os.path.join(data_dir, f"nfl_{season}_{kind}_*.csv")))
+    return files[-1] if files else None
+
+class PlayerStatsLoader:
+    """Per-player and per-team season stats, indexed by team.
+
+    Reads the latest player_* and team_stats snapshots for a season. Each
+    player table gets a team -> row positions index over its single-team
+    rows. team_features() sums the additive player stats per team, adds the
+    standings columns, and maps every abbreviation to its games_df name.
+    """
+
+    def __init__(self, data_dir='nfl_data', season=2023):
+        self.data_dir = os.path.join(os.getcwd(), data_dir)
+        self.season = season
+        self.tables = {}
+        self.team_rows = {}
+        self.team_stats = None
+        self._team_features = None
+
+    def load(self):
+        """Load every available player table and the team standings."""
+        for kind in PLAYER_KINDS:
+            path = latest_file(self.data_dir, self.season, f"player_{kind}")
+            if path is None:
+                continue
+            table = parse_player_table(pd.read_csv(path), kind)
+            self.tables[kind] = table
+            
+            # Index single-team rows by team abbreviation
+            single = np.flatnonzero(~table['multi_team'].to_numpy())
+            codes = table['team'].cat.codes.to_numpy()[single]
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(table['team'].cat.categories) + 1))
+            self.team_rows[kind] = {
+                team: single[order[bounds[i]:bounds[i + 1]]]
+                for i, team in enumerate(table['team'].cat.categories)
+                if bounds[i + 1] > bounds[i]
+            }
+            print(f"Loaded {len(table)} {kind} rows")
+        
+        path = latest_file(self.data_dir, self.season, 'team_stats')
+        if path is not None:
+            self.team_stats = parse_team_stats(pd.read_csv(path))
+            print(f"Loaded {len(self.team_stats)} team standings")
+        self._team_features = None
+        return bool(self.tables) or self.team_stats is not None
+
+    def get_team_players(self, kind, team):
+        """Get the single-team player rows of one team (abbreviation)."""
+        return self.tables[kind].iloc[self.team_rows[kind].get(team, [])]
+
+    def team_features(self):
+        """Get per-team feature vectors indexed by full team name (cached)."""
+        if self._team_features is not None:
+            return self._team_features
+        
+        frames = []
+        for kind, table in self.tables.items():
+            single = table[~table['multi_team']]
+            additive = [
+                c for c in single.columns
+                if pd.api.types.is_float_dtype(single[c]) and not NON_ADDITIVE.search(c)
+            ]
+            totals = single.groupby('team', observed=True)[additive].sum()
+            totals.columns = [f"{kind}_{c}" for c in totals.columns]
+            frames.append(totals)
+        
+        features = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        features.index = features.index.map(lambda abbr: TEAM_ABBREVIATIONS.get(abbr, abbr))
+        
+        if self.team_stats is not None:
+            standings = self.team_stats.select_dtypes(include=[np.number])
+            features = features.join(standings, how='outer') if not features.empty else standings
+        
+        self._team_features = features.fillna(0).astype(np.float32)
+        return self._team_features
+
+    def join_games(self, games_df):
+        """Add winner_* / loser_* team feature columns to games in one pass."""
+        features = self.team_features()
+        matrix = features.to_numpy()
+        
+        # Hash-join: one dictionary lookup per distinct team, then array takes
+        winner_codes = pd.Categorical(games_df['winner'].astype(str), categories=features.index).codes
+        loser_codes = pd.Categorical(games_df['loser'].astype(str), categories=features.index).codes
+        padded = np.vstack([matrix, np.full((1, matrix.shape[1]), np.nan, dtype=matrix.dtype)])
+        
+        joined = [games_df.reset_index(drop=True)]
+        for prefix, codes in (('winner', winner_codes), ('loser', loser_codes)):
+            joined.append(pd.DataFrame(
+                padded[codes],
+                columns=[f"{prefix}_{c}" for c in features.columns]
+            ))
+        return pd.concat(joined, axis=1)
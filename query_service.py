@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from common_opponents import CommonOpponentEngine, rank_teams
+import instrumentation
+from matchup_report import get_prediction
+from nfl_data_prep import NFLDataPreprocessor, check_game_columns
+from nfl_features import TEAM_STATS
+
+class LRUCache:
+    """Least recently used cache of query results."""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.items:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return self.items[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+class QueryService:
+    """Long-running JSON service over one loaded NFLDataPreprocessor.
+
+    Data is loaded once. Query results are cached by (query, data version),
+    and the version changes whenever games are appended, either through
+    POST /games or because a season file changed on disk.
+    """
+
+    def __init__(self, seasons=None, data_dir='nfl_data', cache_size=1024, model_path=None):
+        self.seasons = seasons
+        self.data_dir = data_dir
+        self.preprocessor = NFLDataPreprocessor(data_dir)
+        self.cache = LRUCache(cache_size)
+        self.latencies = deque(maxlen=10000)
+        self.data_version = 0
+        self._engines = {}
+        self._file_stats = {}
+        self._team_histories = None
+        self.model = None
+        if model_path is not None:
+            from nfl_inference import NFLInference
+            self.model = NFLInference.load(model_path)
+        self.routes = {
+            ('GET', '/h2h'): self.head_to_head,
+            ('GET', '/common'): self.common_opponents,
+            ('GET', '/predict'): self.predict,
+            ('GET', '/rankings'): self.rankings,
+            ('GET', '/stats'): self.stats,
+            ('POST', '/games'): self.append_games,
+        }
+
+    def load(self):
+        """(Re)load the games and start a new data version.
+
+        The games are read and indexed before they replace the current data,
+        so a failed reload keeps serving the previous version.
+        """
+        preprocessor = NFLDataPreprocessor(self.data_dir)
+        if not preprocessor.load_data(self.seasons):
+            raise ValueError("Failed to load data")
+        file_stats = self._season_file_stats(preprocessor)
+        if preprocessor.index is None:
+            raise ValueError("No games loaded")
+        self.preprocessor = preprocessor
+        self._file_stats = file_stats
+        self._new_version()
+
+    def _new_version(self):
+        self.data_version += 1
+        self._engines = {}
+        self._team_histories = None
+        self.cache.clear()
+
+    def _season_file_stats(self, preprocessor=None):
+        preprocessor = preprocessor or self.preprocessor
+        stats = {}
+        for season in preprocessor.seasons:
+            path = preprocessor.store.season_file(season)
+            stat = os.stat(path)
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def check_for_new_data(self):
+        """Reload if any season file changed on disk; returns True if it did."""
+        if self._season_file_stats() == self._file_stats:
+            return False
+        self.load()
+        return True
+
+    def engine(self, rule):
+        if rule not in self._engines:
+            self._engines[rule] = CommonOpponentEngine(self.preprocessor.index, rule=rule)
+        return self._engines[rule]
+
+    def _teams(self, params):
+        team1, team2 = params.get('team1'), params.get('team2')
+        if not team1 or not team2:
+            raise KeyError("team1 and team2 are required")
+        for team in (team1, team2):
+            if team not in self.preprocessor.index.team_ids:
+                raise KeyError(f"Unknown team: {team}")
+        return team1, team2
+
+    def head_to_head(self, params):
+        team1, team2 = self._teams(params)
+        games = self.preprocessor.index.get_head_to_head_games(team1, team2)
+        return {
+            'team1': team1,
+            'team2': team2,
+            'games': [
+                {
+                    'date': game.date.strftime('%Y-%m-%d'),
+                    'winner': str(game.winner),
+                    'loser': str(game.loser),
+                    'winner_pts': int(game.winner_pts),
+                    'loser_pts': int(game.loser_pts),
+                }
+                for game in games.itertuples(index=False)
+                # Scheduled games have no score yet
+                if pd.notna(game.winner_pts) and pd.notna(game.loser_pts)
+            ]
+        }
+
+    def common_opponents(self, params):
+        team1, team2 = self._teams(params)
+        index = self.preprocessor.index
+        team1_results = index.get_team_results(team1)
+        team2_results = index.get_team_results(team2)
+        common = sorted((set(team1_results) & set(team2_results)) - {team1, team2})
+        team1_points, team2_points = self.engine('last').get_pair_points(team1, team2)
+        return {
+            'team1': team1,
+            'team2': team2,
+            'common_opponents': [
+                {'opponent': o, 'team1_result': team1_results[o], 'team2_result': team2_results[o]}
+                for o in common
+            ],
+            'team1_points': team1_points,
+            'team2_points': team2_points,
+            'prediction': get_prediction(team1, team2, team1_points, team2_points),
+        }
+
+    def predict(self, params):
+        team1, team2 = self._teams(params)
+        engine = self.engine('last')
+        team1_points, team2_points = engine.get_pair_points(team1, team2)
+        result = {
+            'team1': team1,
+            'team2': team2,
+            'common_opponents': engine.get_common_count(team1, team2),
+            'team1_points': team1_points,
+            'team2_points': team2_points,
+            'prediction': get_prediction(team1, team2, team1_points, team2_points),
+        }
+        if self.model is not None:
+            if self._team_histories is None:
+                # The model was trained on TeamFeatureBuilder features for both teams
+                n_games = self.model.scaler_mean.shape[0] // 2 // len(TEAM_STATS)
+                self._team_histories = self.preprocessor.build_features(n_games).latest_state()
+            scores = self.model.predict_games([(team1, team2)], team_histories=self._team_histories)
+            result['team1_win_probability'] = float(scores['symmetric_team1_win_probability'][0])
+        return result
+
+    def rankings(self, params):
+        engine = self.engine(params.get('rule', 'any'))
+        return {
+            'rankings': [
+                {'rank': rank, 'team': team, 'score': score, 'comparisons': compared, 'avg': avg}
+                for rank, (team, score, compared, avg) in enumerate(rank_teams(engine.teams, engine.points), 1)
+            ]
+        }
+
+    def stats(self, params):
+        latencies = np.array(self.latencies) * 1000
+        percentiles = {}
+        if len(latencies):
+            for q in (50, 90, 99):
+                percentiles[f'p{q}_ms'] = float(np.percentile(latencies, q))
+        return {
+            'data_version': self.data_version,
+            'games': len(self.preprocessor.games_df),
+            'requests': len(latencies),
+            'latency': percentiles,
+            'cache': {'size': len(self.cache.items), 'hits': self.cache.hits, 'misses': self.cache.misses},
+        }
+
+    def append_games(self, params, body):
+        """Append games (JSON list in the games CSV schema) and invalidate the cache."""
+        new_games = pd.DataFrame(json.loads(body or b'[]'))
+        if new_games.empty:
+            return {'added': 0, 'data_version': self.data_version}
+        check_game_columns(new_games)
+        new_games['date'] = pd.to_datetime(new_games['date'])
+        self.preprocessor.append_games(new_games)
+        self._new_version()
+        return {'added': len(new_games), 'data_version': self.data_version}
+
+    def handle(self, method, target, body=b''):
+        """Answer one request; returns (status, payload)."""
+        start = time.perf_counter()
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        handler = self.routes.get((method, url.path))
+        try:
+            if handler is None:
+                return 404, {'error': f"No route for {method} {url.path}"}
+            if method == 'POST':
+                return 200, handler(params, body)
+            if url.path == '/stats':
+                return 200, handler(params)
+            
+            key = (url.path, tuple(sorted(params.items())), self.data_version)
+            payload = self.cache.get(key)
+            if payload is None:
+                payload = handler(params)
+                self.cache.put(key, payload)
+            return 200, payload
+        except KeyError as e:
+            return 400, {'error': str(e.args[0])}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            # Any other failure still gets a reply instead of dropping the connection
+            print(f"Error handling {method} {target}: {type(e).__name__}: {e}")
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def serve_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = b''
+                if 'content-length' in headers:
+                    body = await reader.readexactly(int(headers['content-length']))
+                
+                status, payload = self.handle(method, target, body)
+                data = json.dumps(payload).encode()
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {reason}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def watch_files(self, interval):
+        """Poll the season files and reload when one changes."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.check_for_new_data():
+                    print(f"Season files changed, data version {self.data_version}")
+            except Exception as e:
+                # Keep serving the current data and try again on the next poll
+                print(f"Error reloading season files: {type(e).__name__}: {e}")
+
+    async def serve(self, host='127.0.0.1', port=8000, poll_interval=30):
+        self.load()
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        print(f"Serving on http://{host}:{port}")
+        watcher = asyncio.create_task(self.watch_files(poll_interval)) if poll_interval else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Serve head-to-head, common-opponent, prediction and ranking queries')
+    parser.add_argument('--seasons', nargs='+', type=int, default=None,
+                        help='Seasons to load (default: 2023)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help='Number of query results to keep')
+    parser.add_argument('--poll-interval', type=float, default=30,
+                        help='Seconds between checks for changed season files (0 to disable)')
+    parser.add_argument('--model',
+                        help='Model exported with NFLPredictor.export_model, for win probabilities')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    service = QueryService(args.seasons, cache_size=args.cache_size, model_path=args.model)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.poll_interval))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
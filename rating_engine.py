@@ -0,0 +1,235 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import lsqr
+
+import instrumentation
+
+def _game_arrays(games_df, regular_season=False):
+    """Get the scored games as plain arrays: season, date, winner, loser, points."""
+    winner_pts = pd.to_numeric(games_df['winner_pts'], errors='coerce')
+    loser_pts = pd.to_numeric(games_df['loser_pts'], errors='coerce')
+    keep = winner_pts.notna() & loser_pts.notna()
+    if regular_season:
+        # Playoff rounds have named weeks ('WildCard', ...)
+        keep &= pd.to_numeric(games_df['week'].astype(str), errors='coerce').notna()
+    keep = keep.to_numpy()
+
+    dates = pd.to_datetime(games_df['date'])
+    if 'season' in games_df.columns:
+        seasons = games_df['season'].to_numpy()
+    else:
+        # January/February games belong to the previous season
+        seasons = (dates.dt.year - (dates.dt.month < 3)).to_numpy()
+    return {
+        'season': seasons[keep].astype(np.int32),
+        'date': dates.to_numpy()[keep],
+        'winner': games_df['winner'].astype(str).to_numpy()[keep],
+        'loser': games_df['loser'].astype(str).to_numpy()[keep],
+        'winner_pts': winner_pts.to_numpy()[keep].astype(np.float64),
+        'loser_pts': loser_pts.to_numpy()[keep].astype(np.float64),
+    }
+
+class RatingEngine:
+    """Margin-based team ratings (SRS) from one sparse least-squares solve.
+
+    Every game is a row of a sparse game x team design matrix with +1 for
+    the winner and -1 for the loser, and the ratings r are the least-squares
+    fit of margin = r_winner - r_loser with the ratings of each season
+    summing to zero. This is the fixed point PFR iterates to for SRS:
+    a team's rating is its average margin (MOV) plus the average rating of
+    its opponents (SOS).
+
+    With split=True each game gives two rows instead, one per team:
+    points = league_average + offense - opponent_defense, so OSRS + DSRS =
+    SRS. half_life (days) down-weights older games by 0.5 ** (age /
+    half_life), age counted from the last game of the season (or of all
+    games when by_season=False). by_season=False fits one rating per team
+    across every loaded season.
+
+    All seasons are columns of the same block-diagonal system, so 50+
+    seasons are still a single solve.
+    """
+
+    def __init__(self, games_df, split=False, half_life=None, by_season=True, regular_season=False):
+        self.split = split
+        self.half_life = half_life
+        self.by_season = by_season
+        self.games = _game_arrays(games_df, regular_season)
+        self.ratings = None
+
+    def _weights(self, groups, n_groups):
+        """Get the recency weight of every game."""
+        if not self.half_life:
+            return np.ones(len(groups))
+        days = self.games['date'].astype('datetime64[s]').astype(np.float64) / 86400
+        latest = np.full(n_groups, -np.inf)
+        np.maximum.at(latest, groups, days)
+        return 0.5 ** ((latest[groups] - days) / self.half_life)
+
+    def solve(self):
+        """Get a DataFrame with one row of ratings per team (and season)."""
+        with instrumentation.span('solve_ratings'):
+            self.ratings = self._solve()
+        instrumentation.count('rating_games', len(self.games['season']))
+        return self.ratings
+
+    def _solve(self):
+        games = self.games
+        n_games = len(games['season'])
+        if self.by_season:
+            group_keys, groups = np.unique(games['season'], return_inverse=True)
+        else:
+            group_keys, groups = np.array([0]), np.zeros(n_games, dtype=np.int64)
+        n_groups = len(group_keys)
+
+        # One column per (group, team) that actually played
+        teams = np.array(sorted(set(games['winner']) | set(games['loser'])))
+        winner_ids = np.searchsorted(teams, games['winner'])
+        loser_ids = np.searchsorted(teams, games['loser'])
+        keys, columns = np.unique(
+            np.concatenate([groups * len(teams) + winner_ids, groups * len(teams) + loser_ids]),
+            return_inverse=True
+        )
+        winner_cols, loser_cols = columns[:n_games], columns[n_games:]
+        n_cols = len(keys)
+        col_groups = keys // len(teams)
+
+        scale = np.sqrt(self._weights(groups, n_groups))
+        game_rows = np.arange(n_games)
+        # Sum-to-zero rows, one per group; they only pin down the free constant
+        constraint_rows = n_games * (2 if self.split else 1) + col_groups
+
+        if not self.split:
+            rows = np.concatenate([game_rows, game_rows, constraint_rows])
+            cols = np.concatenate([winner_cols, loser_cols, np.arange(n_cols)])
+            data = np.concatenate([scale, -scale, np.ones(n_cols)])
+            target = np.concatenate([
+                scale * (games['winner_pts'] - games['loser_pts']), np.zeros(n_groups)
+            ])
+            design = sparse.csr_matrix((data, (rows, cols)), shape=(n_games + n_groups, n_cols))
+            srs = self._lsqr(design, target)
+        else:
+            # Unknowns: offense (n_cols), defense (n_cols), league average (n_groups)
+            winner_rows, loser_rows = 2 * game_rows, 2 * game_rows + 1
+            rows = np.concatenate([
+                winner_rows, winner_rows, winner_rows,
+                loser_rows, loser_rows, loser_rows,
+                constraint_rows, constraint_rows + n_groups,
+            ])
+            cols = np.concatenate([
+                winner_cols, n_cols + loser_cols, 2 * n_cols + groups,
+                loser_cols, n_cols + winner_cols, 2 * n_cols + groups,
+                np.arange(n_cols), n_cols + np.arange(n_cols),
+            ])
+            data = np.concatenate([
+                scale, -scale, scale, scale, -scale, scale, np.ones(2 * n_cols),
+            ])
+            target = np.zeros(2 * n_games + 2 * n_groups)
+            target[winner_rows] = scale * games['winner_pts']
+            target[loser_rows] = scale * games['loser_pts']
+            design = sparse.csr_matrix(
+                (data, (rows, cols)), shape=(2 * n_games + 2 * n_groups, 2 * n_cols + n_groups)
+            )
+            solution = self._lsqr(design, target)
+            offense, defense = solution[:n_cols], solution[n_cols:2 * n_cols]
+            srs = offense + defense
+
+        # Unweighted average margin, so SOS = SRS - MOV as on PFR
+        margin = games['winner_pts'] - games['loser_pts']
+        played = np.bincount(winner_cols, minlength=n_cols) + np.bincount(loser_cols, minlength=n_cols)
+        margin_total = (np.bincount(winner_cols, weights=margin, minlength=n_cols)
+                        - np.bincount(loser_cols, weights=margin, minlength=n_cols))
+        mov = margin_total / np.maximum(played, 1)
+
+        ratings = pd.DataFrame({
+            'season': group_keys[col_groups] if self.by_season else None,
+            'team': teams[keys % len(teams)],
+            'games': played,
+            'mov': mov,
+            'sos': srs - mov,
+            'srs': srs,
+        })
+        if self.split:
+            ratings['osrs'] = offense
+            ratings['dsrs'] = defense
+        if not self.by_season:
+            ratings = ratings.drop(columns='season')
+        return ratings
+
+    @staticmethod
+    def _lsqr(design, target):
+        """Least-squares solution (minimum norm if a season's schedule is disconnected)."""
+        return lsqr(design, target, atol=1e-12, btol=1e-12, iter_lim=10 * design.shape[1])[0]
+
+    def get_rankings(self, season=None):
+        """Get a ranking table (rank, team, srs, ...) for one season, or all games."""
+        if self.ratings is None:
+            self.solve()
+        table = self.ratings
+        if season is not None:
+            table = table[table['season'] == season]
+        table = table.drop(columns='season', errors='ignore')
+        table = table.sort_values('srs', ascending=False, kind='stable').reset_index(drop=True)
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+        return table
+
+    def seasons(self):
+        """Get the seasons with ratings (empty when by_season=False)."""
+        if not self.by_season:
+            return []
+        return np.unique(self.games['season']).tolist()
+
+def print_rankings(key, table):
+    """Print a rating table in the nfl-scores.py format."""
+    label = f" for {key}" if key is not None else ""
+    print(f"\nFinal Team Rankings{label} (based on margin-of-victory ratings):")
+    print("========================================================")
+    split = 'osrs' in table.columns
+    for row in table.itertuples(index=False):
+        line = f"{row.rank}. {row.team:<30} SRS: {row.srs:>6.2f} (MOV: {row.mov:>6.2f}, SOS: {row.sos:>6.2f}"
+        if split:
+            line += f", OSRS: {row.osrs:>6.2f}, DSRS: {row.dsrs:>6.2f}"
+        print(line + ")")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Margin-based SRS ratings from a sparse least-squares solve')
+    parser.add_argument('first_season', type=int, nargs='?', default=2023)
+    parser.add_argument('last_season', type=int, nargs='?', default=None)
+    parser.add_argument('--split', action='store_true',
+                        help='Also solve offense/defense ratings (OSRS/DSRS)')
+    parser.add_argument('--half-life', type=float, default=None,
+                        help='Recency weighting: days for a game to count half as much')
+    parser.add_argument('--combined', action='store_true',
+                        help='One rating per team across all seasons instead of one per season')
+    parser.add_argument('--regular-season', action='store_true',
+                        help='Ignore playoff games (as PFR does for SRS)')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    from nfl_data_prep import NFLDataPreprocessor
+
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    last_season = args.last_season if args.last_season is not None else args.first_season
+    preprocessor = NFLDataPreprocessor()
+    if not preprocessor.load_data(range(args.first_season, last_season + 1)):
+        print("Failed to load data")
+        return
+
+    engine = RatingEngine(
+        preprocessor.games_df, split=args.split, half_life=args.half_life,
+        by_season=not args.combined, regular_season=args.regular_season
+    )
+    engine.solve()
+    if args.combined:
+        print_rankings(None, engine.get_rankings())
+    else:
+        for season in engine.seasons():
+            print_rankings(season, engine.get_rankings(season))
+
+if __name__ == "__main__":
+    main()
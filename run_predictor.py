@@ -1,29 +1,30 @@
-from nfl_data_prep import NFLDataPreprocessor
+from nfl_data_prep import NFLDataPreprocessor, TeamIndex
+from matchup_report import SINKS, TRANSITIVE_FIELDS, CsvSink, TextSink, get_prediction, iter_matchups, write_matchups
+import instrumentation
+import argparse
+import contextlib
+import sys
 import pandas as pd
 
-def get_team_results(games_df, team):
+def get_team_results(games_df, team, index=None):
     """Get wins and losses for a team with opponents"""
-    results = {}
-    team_games = games_df[
-        (games_df['winner'] == team) | (games_df['loser'] == team)
-    ]
-    
-    for _, game in team_games.iterrows():
-        opponent = game['loser'] if game['winner'] == team else game['winner']
-        won = game['winner'] == team
-        results[opponent] = 'won' if won else 'lost'
-    
-    return results
+    if index is None:
+        index = TeamIndex(games_df)
+    return index.get_team_results(team)
 
-def get_all_teams(games_df):
+def get_all_teams(games_df, index=None):
     """Get list of all teams"""
+    if index is not None:
+        return list(index.teams)
     teams = set(pd.concat([games_df['winner'], games_df['loser']]))
     return sorted(list(teams))
 
-def analyze_common_opponents(games_df, team1, team2):
+def analyze_common_opponents(games_df, team1, team2, index=None):
     """Analyze how two teams performed against common opponents"""
-    team1_results = get_team_results(games_df, team1)
-    team2_results = get_team_results(games_df, team2)
+    if index is None:
+        index = TeamIndex(games_df)
+    team1_results = get_team_results(games_df, team1, index)
+    team2_results = get_team_results(games_df, team2, index)
     
     common_opponents = set(team1_results.keys()) & set(team2_results.keys())
     common_opponents = common_opponents - {team1, team2}  # Remove the teams themselves
@@ -50,13 +51,7 @@ def analyze_common_opponents(games_df, team1, team2):
     analysis += f"{team1}: {team1_points} points\n"
     analysis += f"{team2}: {team2_points} points\n"
     
-    prediction = ""
-    if team1_points > team2_points:
-        prediction = f"{team1} predicted to win (+{team1_points-team2_points} points)"
-    elif team2_points > team1_points:
-        prediction = f"{team2} predicted to win (+{team2_points-team1_points} points)"
-    else:
-        prediction = "Even matchup"
+    prediction = get_prediction(team1, team2, team1_points, team2_points)
     
     analysis += f"Prediction: {prediction}\n"
     
@@ -70,40 +65,78 @@ def analyze_common_opponents(games_df, team1, team2):
         'analysis': analysis
     }
 
+def describe_transitive(record):
+    """Explain a pair compared through chains of opponents"""
+    analysis = f"\n{record['team1']} vs {record['team2']}\n"
+    analysis += f"No common opponents; compared through chains of {record['hops']} opponents\n"
+    analysis += f"\nResults:\n"
+    analysis += f"{record['team1']}: {record['team1_points']} points\n"
+    analysis += f"{record['team2']}: {record['team2_points']} points\n"
+    analysis += f"Prediction: {record['prediction']}\n"
+    return analysis
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Predict every matchup from common opponent results')
+    parser.add_argument('--format', choices=sorted(SINKS), default='text',
+                        help='Output format (default: text)')
+    parser.add_argument('--output', default='-',
+                        help='File to write results to (default: stdout)')
+    parser.add_argument('--no-explain', action='store_true',
+                        help='Skip the per-matchup explanation in text output')
+    parser.add_argument('--max-hops', type=int, choices=[1, 2, 3], default=1,
+                        help='Compare pairs without common opponents through chains of up to this many opponents')
+    parser.add_argument('--decay', type=float, default=0.5,
+                        help='Weight multiplier per extra opponent in a chain (default: 0.5)')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
 def main():
-    # Initialize preprocessor
-    preprocessor = NFLDataPreprocessor()
-    
-    # Load data
-    if not preprocessor.load_data():
-        print("Failed to load data")
-        return
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    structured = args.format != 'text'
     
-    # Get all teams
-    teams = get_all_teams(preprocessor.games_df)
-    print(f"\nAnalyzing {len(teams)} teams:")
-    for team in teams:
-        print(f"- {team}")
-    
-    # Analyze all possible matchups
-    print("\nAnalyzing all matchups...")
-    results = []
-    
-    for i in range(len(teams)):
-        for j in range(i + 1, len(teams)):
-            team1 = teams[i]
-            team2 = teams[j]
-            
-            analysis = analyze_common_opponents(preprocessor.games_df, team1, team2)
-            if analysis['common_opponents'] > 0:  # Only show if they have common opponents
-                print(analysis['analysis'])
-                results.append(analysis)
+    # Keep status messages out of structured output
+    status = contextlib.redirect_stdout(sys.stderr) if structured else contextlib.nullcontext()
+    with status:
+        # Initialize preprocessor
+        preprocessor = NFLDataPreprocessor()
+        
+        # Load data
+        if not preprocessor.load_data():
+            print("Failed to load data")
+            return
+        
+        # Get all teams
+        teams = get_all_teams(preprocessor.games_df, preprocessor.index)
+        print(f"\nAnalyzing {len(teams)} teams:")
+        for team in teams:
+            print(f"- {team}")
+        
+        print("\nAnalyzing all matchups...")
     
-    # Summary
-    print("\nSummary of Predictions:")
-    print("=====================")
-    for result in results:
-        print(f"{result['team1']} vs {result['team2']}: {result['prediction']}")
+    stream = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        if args.format == 'csv' and args.max_hops > 1:
+            sink = CsvSink(stream, TRANSITIVE_FIELDS)
+        elif structured:
+            sink = SINKS[args.format](stream)
+        else:
+            # Explanations are rendered one record at a time, only when wanted
+            render = None
+            if not args.no_explain:
+                render = lambda record: describe_transitive(record) if record.get('hops', 1) > 1 else analyze_common_opponents(
+                    preprocessor.games_df, record['team1'], record['team2'], preprocessor.index
+                )['analysis']
+            sink = TextSink(stream, render)
+        
+        # Only pairs with common opponents (or, with --max-hops, a chain) are reported
+        matchups = iter_matchups(
+            preprocessor.index, rule='last', min_common=1, max_hops=args.max_hops, decay=args.decay
+        )
+        write_matchups(matchups, sink)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,19 +1,91 @@
-from scraper_class import PFRScraper
+import instrumentation
+import argparse
+import json
 import os
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape NFL game scores from Pro Football Reference')
+    parser.add_argument('years', nargs='*', type=int, default=[2022],
+                        help='Seasons to scrape (default: 2022)')
+    parser.add_argument('--through', type=int,
+                        help='Scrape every season from the first year through this one')
+    parser.add_argument('--max-concurrency', type=int, default=4,
+                        help='Number of seasons to scrape at once')
+    parser.add_argument('--requests-per-second', type=float,
+                        help='Overall request rate limit')
+    parser.add_argument('--base-url', default='https://www.pro-football-reference.com',
+                        help='Site to scrape (e.g. a local test server)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Append only games newer than those already saved')
+    parser.add_argument('--cache-ttl', type=float, default=0,
+                        help='Seconds to serve cached pages without revalidating')
+    parser.add_argument('--cache-max-mb', type=float, default=500,
+                        help='Size limit of the response cache')
+    parser.add_argument('--offline', action='store_true',
+                        help='Serve pages only from the response cache')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the response cache')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    instrumentation.enable_from_args(args)
+    
+    # requests, lxml and pandas load only once there is something to scrape
+    from scraper_class import PFRScraper
+    from http_cache import ResponseCache
+    
     # Create nfl_data directory if it doesn't exist
     if not os.path.exists('nfl_data'):
         os.makedirs('nfl_data')
         print("Created nfl_data directory")
     
+    years = args.years
+    if args.through is not None:
+        years = list(range(years[0], args.through + 1))
+    
     # Initialize scraper
-    scraper = PFRScraper()
+    scraper_kwargs = {'base_url': args.base_url}
+    if not args.no_cache:
+        scraper_kwargs['cache'] = ResponseCache(
+            os.path.join('nfl_data', '.http_cache'),
+            ttl=args.cache_ttl,
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            offline=args.offline
+        )
+    if args.requests_per_second is not None:
+        scraper_kwargs['requests_per_second'] = args.requests_per_second
+    scraper = PFRScraper(**scraper_kwargs)
     
     try:
-        # Scrape 2022 season
-        print("\nScraping 2022 season...")
-        year = 2022
+        # Incremental runs never overwrite stored seasons, however many years
+        if args.incremental:
+            for year in years:
+                print(f"\nIngesting new {year} games...")
+                change_set = scraper.ingest_new_games(year)
+                
+                # Log the change-set so downstream jobs can update only what changed
+                changes_filename = os.path.join('nfl_data', f'nfl_{year}_changes.jsonl')
+                if change_set['added_game_ids']:
+                    with open(changes_filename, 'a') as f:
+                        f.write(json.dumps(change_set) + '\n')
+                    print(f"Change-set written to: {changes_filename}")
+                for added in change_set['added_game_ids']:
+                    print(f"+ {added}")
+            return
+        
+        if len(years) > 1:
+            print(f"\nScraping {len(years)} seasons ({years[0]}-{years[-1]})...")
+            saved, failed = scraper.scrape_seasons(years, max_concurrency=args.max_concurrency)
+            print(f"\nSaved {len(saved)} seasons")
+            if failed:
+                print(f"Failed seasons: {', '.join(str(y) for y in sorted(failed))}")
+            return
+        
+        # Scrape a single season
+        year = years[0]
+        print(f"\nScraping {year} season...")
         
         # Get games data
         games_df = scraper.scrape_game_scores(year)
@@ -38,4 +110,4 @@ def main():
         print(traceback.format_exc())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
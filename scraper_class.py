@@ -1,42 +1,178 @@
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from io import StringIO
+from email.utils import parsedate_to_datetime
+
+from html_tables import extract_table, extract_tables
+import instrumentation
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Pro Football Reference allows about 20 requests per minute
+PFR_REQUESTS_PER_SECOND = 20 / 60
+
+# Playoff rounds sort after every regular season week
+PLAYOFF_WEEKS = {'WildCard': 100, 'Division': 101, 'ConfChamp': 102, 'SuperBowl': 103}
+
+def week_rank(week):
+    """Get a sortable number for a week label ('1'..'18' or a playoff round)."""
+    week = str(week)
+    if week in PLAYOFF_WEEKS:
+        return PLAYOFF_WEEKS[week]
+    try:
+        return int(float(week))
+    except ValueError:
+        return -1
+
+def kickoff_times(df):
+    """Get stored date strings ('2023-09-07 20:20:00'): each game's date plus its kickoff time."""
+    dates = pd.to_datetime(df['date'].astype(str), format='ISO8601').dt.normalize()
+    if 'time' in df.columns:
+        kickoff = pd.to_datetime(df['time'].astype(str), format='%I:%M%p', errors='coerce')
+        dates = dates + (kickoff - kickoff.dt.normalize()).fillna(pd.Timedelta(0))
+    return dates.dt.strftime('%Y-%m-%d %H:%M:%S')
+
+def _game_keys(df):
+    dates = pd.to_datetime(df['date'].astype(str), format='ISO8601').dt.strftime('%Y-%m-%d')
+    return dates + '|' + df['winner'].astype(str) + '|' + df['loser'].astype(str)
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the overall request rate."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 class PFRScraper:
-    def __init__(self):
-        self.base_url = "https://www.pro-football-reference.com"
+    def __init__(self, base_url="https://www.pro-football-reference.com",
+                 requests_per_second=PFR_REQUESTS_PER_SECOND, max_retries=3, backoff_base=2.0,
+                 backoff_cap=60.0, timeout=30, pool_size=10, cache=None):
+        self.base_url = base_url.rstrip('/')
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        self.cache = cache
+        
+        # One pooled session so connections are reused across requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
-    def _get_soup(self, url):
-        """Make request and return BeautifulSoup object with retry logic."""
-        max_retries = 3
-        for attempt in range(max_retries):
+    def _retry_delay(self, attempt, response=None):
+        """Get seconds to wait before the next attempt."""
+        # Honor the server's Retry-After header when present
+        if response is not None and 'Retry-After' in response.headers:
+            retry_after = response.headers['Retry-After']
             try:
-                response = requests.get(url, headers=self.headers)
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return max(0.0, retry_at.timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        # Otherwise exponential backoff with full jitter
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+    
+    def _get(self, url):
+        """Get a URL, going through the response cache when one is configured."""
+        if self.cache is None:
+            return self._request(url)
+        
+        cached = self.cache.lookup(url)
+        if cached is not None:
+            instrumentation.count('http_cache_hits')
+            return cached
+        if self.cache.offline:
+            raise ValueError(f"Offline mode: {url} is not cached")
+        
+        # Revalidate with a conditional GET; 304 means the cached body is current
+        response = self._request(url, self.cache.conditional_headers(url))
+        if response.status_code == 304:
+            instrumentation.count('http_not_modified')
+            return self.cache.revalidated(url, response)
+        return self.cache.store(url, response)
+    
+    def _request(self, url, headers=None):
+        """Make a rate-limited request with retry logic and return the response."""
+        for attempt in range(self.max_retries):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            response = None
+            if attempt > 0:
+                instrumentation.count('http_retries')
+            try:
+                instrumentation.count('http_requests')
+                with instrumentation.span('http_request'):
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
                 response.raise_for_status()
-                return BeautifulSoup(response.content, 'html.parser')
             except requests.RequestException as e:
-                if attempt == max_retries - 1:
+                # Client errors other than 429 will not succeed on retry
+                status = getattr(e.response, 'status_code', None)
+                if status is not None and status not in RETRY_STATUS_CODES:
+                    raise e
+                if attempt == self.max_retries - 1:
                     raise e
-                time.sleep(5 * (attempt + 1))
+            time.sleep(self._retry_delay(attempt, response))
     
     def scrape_game_scores(self, year):
         """Scrape game scores and basic stats from season schedule."""
+        with instrumentation.span('scrape_game_scores'):
+            return self._scrape_game_scores(year)
+    
+    def _scrape_game_scores(self, year):
         print(f"Scraping {year} game scores...")
         url = f"{self.base_url}/years/{year}/games.htm"
         
-        soup = self._get_soup(url)
-        games_table = soup.find('table', {'id': 'games'})
+        response = self._get(url)
         
-        if not games_table:
-            raise ValueError(f"Could not find games table for {year}")
+        # An unchanged page was already parsed on an earlier run
+        digest = getattr(response, 'digest', None)
+        if digest is not None:
+            df = self.cache.load_parsed(digest, 'games')
+            if df is not None:
+                instrumentation.count('parsed_cache_hits')
+                print(f"Page unchanged, reusing {len(df)} parsed games")
+                return df
         
-        df = pd.read_html(StringIO(str(games_table)))[0]
+        # Only the games table is parsed, straight into typed columns
+        with instrumentation.span('parse_games_page'):
+            df = extract_table(response.content, 'games')
+        
+        if df is None:
+            raise ValueError(f"Could not find games table for {year}")
         
         # Clean up column names
         df.columns = df.columns.str.lower().str.replace('/', '_').str.replace(' ', '_')
@@ -59,5 +195,109 @@ class PFRScraper:
         # Convert date
         df['date'] = pd.to_datetime(df['date'].astype(str))
         
+        if digest is not None:
+            self.cache.save_parsed(digest, 'games', df)
+        
         print(f"Successfully processed {len(df)} games")
-        return df
\ No newline at end of file
+        return df
+    
+    def scrape_tables(self, path, table_ids):
+        """Get {table_id: DataFrame or None} from one page, e.g. ('/years/2023/passing.htm', ['passing']).
+
+        Tables PFR ships inside HTML comments are included.
+        """
+        response = self._get(f"{self.base_url}{path}")
+        with instrumentation.span('parse_stats_page'):
+            return extract_tables(response.content, table_ids)
+    
+    def scrape_seasons(self, years, max_concurrency=4, output_dir='nfl_data'):
+        """Scrape several seasons concurrently, saving each CSV as soon as it is done.
+
+        Returns (saved, failed): {year: csv path} and {year: exception}.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        saved = {}
+        failed = {}
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {executor.submit(self.scrape_game_scores, year): year for year in years}
+            for future in as_completed(futures):
+                year = futures[future]
+                try:
+                    games_df = future.result()
+                except Exception as e:
+                    print(f"Failed to scrape {year}: {str(e)}")
+                    failed[year] = e
+                    continue
+                
+                games_filename = os.path.join(output_dir, f'nfl_{year}_games.csv')
+                tmp_filename = games_filename + '.tmp'
+                games_df.to_csv(tmp_filename, index=False)
+                os.replace(tmp_filename, games_filename)
+                print(f"Saved {len(games_df)} games to: {games_filename}")
+                saved[year] = games_filename
+        
+        return saved, failed
+    
+    def ingest_new_games(self, year, output_dir='nfl_data'):
+        """Append games newer than those already stored for a season.
+
+        Only completed rows from the latest stored week onwards are kept, and
+        rows whose (date, winner, loser) is already stored are dropped. The
+        season CSV is rewritten atomically. Returns a change-set dict with the
+        ids and CSV row positions of the added games and the teams they touch.
+        """
+        games_filename = os.path.join(output_dir, f'nfl_{year}_games.csv')
+        existing = None
+        latest_week = -1
+        if os.path.exists(games_filename):
+            existing = pd.read_csv(games_filename)
+            completed = existing[pd.to_numeric(existing['winner_pts'], errors='coerce').notna()]
+            if not completed.empty:
+                latest_week = completed['week'].map(week_rank).max()
+        
+        games_df = self.scrape_game_scores(year)
+        
+        # Only completed games from the latest stored week onwards
+        new_games = games_df[
+            pd.to_numeric(games_df['winner_pts'], errors='coerce').notna() &
+            (games_df['week'].map(week_rank) >= latest_week)
+        ]
+        
+        # Drop games that are already stored
+        keys = _game_keys(new_games)
+        keep = ~keys.duplicated()
+        if existing is not None:
+            keep &= ~keys.isin(set(_game_keys(existing)))
+        new_games = new_games[keep.to_numpy()]
+        
+        first_row = 0 if existing is None else len(existing)
+        change_set = {
+            'season': year,
+            'added_game_ids': _game_keys(new_games).tolist(),
+            'rows': [first_row, first_row + len(new_games)],
+            'teams': sorted(set(new_games['winner']) | set(new_games['loser'])),
+        }
+        if new_games.empty:
+            print(f"No new games for {year}")
+            return change_set
+        
+        # Rewrite the season file atomically with the new rows appended,
+        # dates written as the stored files keep them
+        new_games = new_games.assign(date=kickoff_times(new_games))
+        os.makedirs(output_dir, exist_ok=True)
+        tmp_filename = games_filename + '.tmp'
+        if existing is not None:
+            new_games = new_games.reindex(columns=existing.columns)
+            with open(games_filename, 'rb') as src, open(tmp_filename, 'wb') as dst:
+                content = src.read()
+                dst.write(content)
+                if content and not content.endswith(b'\n'):
+                    dst.write(b'\n')
+            new_games.to_csv(tmp_filename, mode='a', header=False, index=False)
+        else:
+            new_games.to_csv(tmp_filename, index=False)
+        os.replace(tmp_filename, games_filename)
+        
+        print(f"Appended {len(new_games)} new games to: {games_filename}")
+        return change_set
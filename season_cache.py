@@ -0,0 +1,115 @@
+import array
+import ast
+import json
+import os
+import sys
+import zipfile
+from datetime import datetime, timedelta
+
+# Format of the files SeasonStore writes; bump to force a rebuild
+CACHE_VERSION = 1
+
+# Read-only access to the season cache. read_columns needs only the standard
+# library, for quick lookups (nfl_cli.py); SeasonStore builds and refreshes
+# the files and reads them back with numpy.
+
+# array module typecodes of the .npy dtypes _save_frame writes
+NPY_TYPECODES = {
+    'b1': 'B', 'i1': 'b', 'u1': 'B', 'i2': 'h', 'u2': 'H', 'i4': 'i', 'u4': 'I',
+    'i8': 'q', 'u8': 'Q', 'f4': 'f', 'f8': 'd',
+}
+
+# int64 value of NaT in datetime64 columns
+NAT = -2 ** 63
+
+def cache_paths(cache_dir, season):
+    """Get the (.npz, .json) cache file paths of a season."""
+    base = os.path.join(cache_dir, f"nfl_{season}_games")
+    return base + '.npz', base + '.json'
+
+def cached_meta(csv_path, meta_path):
+    """Get a season's cache metadata if the cache matches the CSV's size and mtime, else None."""
+    try:
+        stat = os.stat(csv_path)
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != CACHE_VERSION:
+        return None
+    if meta.get('mtime_ns') != stat.st_mtime_ns or meta.get('size') != stat.st_size:
+        return None
+    return meta
+
+def _read_npy(f):
+    """Get a 1-d .npy array as a list, using only the standard library."""
+    major = f.read(8)[6]
+    size = 2 if major == 1 else 4
+    header_len = int.from_bytes(f.read(size), 'little')
+    header = ast.literal_eval(f.read(header_len).decode('latin1'))
+    order, kind = header['descr'][0], header['descr'][1:]
+    length = header['shape'][0]
+    data = f.read()
+    if kind[0] == 'U':
+        width = int(kind[1:])
+        text = data.decode('utf-32-be' if order == '>' else 'utf-32-le')
+        return [text[i * width:(i + 1) * width].rstrip('\x00') for i in range(length)]
+    values = array.array(NPY_TYPECODES[kind], data)
+    if order in '<>' and (order == '>') != (sys.byteorder == 'big'):
+        values.byteswap()
+    return values.tolist()
+
+def _read_numpy(f):
+    import numpy as np
+    return np.lib.format.read_array(f, allow_pickle=False)
+
+def read_parts(npz_path, columns=None, read_array=_read_numpy):
+    """Get {column: (kind, {part: array})} from a cached season, as _save_frame wrote it.
+
+    kind is 'category' (codes, categories), 'datetime' (values as int64),
+    'nullable' (values, mask) or 'numeric' (values). Both read_columns and
+    SeasonStore build their columns from these parts. read_array reads one
+    .npy member (numpy by default; _read_npy gives lists).
+    """
+    with zipfile.ZipFile(npz_path) as archive:
+        def member(key):
+            with archive.open(key + '.npy') as f:
+                return read_array(f)
+
+        keys = [name[:-len('.npy')] for name in archive.namelist()]
+        names = list(member('__columns__'))
+        kinds = list(member('__kinds__'))
+        parts = {}
+        for i, (name, kind) in enumerate(zip(names, kinds)):
+            if columns is not None and name not in columns:
+                continue
+            prefix = f"c{i}_"
+            parts[name] = (kind, {
+                key[len(prefix):]: member(key) for key in keys if key.startswith(prefix)
+            })
+    return parts
+
+def read_columns(npz_path, columns=None):
+    """Get {column: list} from a cached season (default: every column).
+
+    Reads the file with the standard library only. Categorical columns
+    come back as strings ('' for missing), dates as datetime (None for NaT)
+    and missing
+    nullable integers as None.
+    """
+    lists = {}
+    for name, (kind, part) in read_parts(npz_path, columns, read_array=_read_npy).items():
+        if kind == 'category':
+            categories = part['categories'] + ['']
+            lists[name] = [categories[code] for code in part['codes']]
+        elif kind == 'datetime':
+            epoch = datetime(1970, 1, 1)
+            lists[name] = [
+                None if value == NAT else epoch + timedelta(microseconds=value // 1000)
+                for value in part['values']
+            ]
+        elif kind == 'nullable':
+            lists[name] = [None if missing else value for value, missing in zip(part['values'], part['mask'])]
+        else:
+            lists[name] = part['values']
+    return lists
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+def remaining_games(games_df):
+    """Get (team1, team2) pairs for schedule rows that have no score yet."""
+    unplayed = pd.to_numeric(games_df['winner_pts'], errors='coerce').isna()
+    rows = games_df[unplayed]
+    return list(zip(rows['winner'].astype(str), rows['loser'].astype(str)))
+
+def common_opponent_probabilities(engine, pairs, scale=0.25):
+    """Turn common-opponent point differences into team1 win probabilities.
+
+    A logistic curve maps team1_points - team2_points to a probability;
+    scale sets how fast an edge becomes certain.
+    """
+    ids = engine.index.team_ids
+    team1 = np.array([ids[t1] for t1, _ in pairs], dtype=np.int64)
+    team2 = np.array([ids[t2] for _, t2 in pairs], dtype=np.int64)
+    diff = engine.points[team1, team2] - engine.points[team2, team1]
+    return 1 / (1 + np.exp(-scale * diff))
+
+def model_probabilities(predictor, pairs, team_histories):
+    """Get team1 win probabilities for all pairs in one batched predictor pass."""
+    results = predictor.predict_games(pairs, team_histories=team_histories)
+    return np.asarray(results['symmetric_team1_win_probability'], dtype=np.float64)
+
+def _percentile_from_counts(counts, q):
+    """Get the q-th percentile of each row's histogram (bins 0..n-1)."""
+    cumulative = np.cumsum(counts, axis=1)
+    target = q / 100 * cumulative[:, -1:]
+    return (cumulative < target).sum(axis=1)
+
+class SeasonSimulator:
+    """Vectorized Monte Carlo simulation of the rest of a season.
+
+    Each chunk of simulations draws every remaining game at once as a
+    (chunk, games) boolean matrix. Final win totals come from two matrix
+    products with the game -> team incidence matrices. Only per-team
+    histograms of wins and ranks are kept between chunks, so memory is
+    bounded by chunk_size whatever n_sims is.
+    """
+
+    def __init__(self, games_df, remaining, probabilities, groups=None):
+        completed = pd.to_numeric(games_df['winner_pts'], errors='coerce').notna().to_numpy()
+        winners = games_df['winner'].astype(str).to_numpy()[completed]
+        losers = games_df['loser'].astype(str).to_numpy()[completed]
+        
+        self.teams = sorted(set(winners) | set(losers) | {t for pair in remaining for t in pair})
+        team_ids = {team: i for i, team in enumerate(self.teams)}
+        n_teams = len(self.teams)
+        
+        # Wins so far
+        self.current_wins = np.bincount(
+            [team_ids[w] for w in winners], minlength=n_teams
+        ).astype(np.int32)
+        
+        # Game -> team incidence matrices for the remaining schedule
+        n_games = len(remaining)
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+        self.team1_matrix = np.zeros((n_games, n_teams), dtype=np.float32)
+        self.team2_matrix = np.zeros((n_games, n_teams), dtype=np.float32)
+        for g, (team1, team2) in enumerate(remaining):
+            self.team1_matrix[g, team_ids[team1]] = 1
+            self.team2_matrix[g, team_ids[team2]] = 1
+        self.max_wins = int(self.current_wins.max(initial=0)) + int(
+            (self.team1_matrix + self.team2_matrix).sum(axis=0).max(initial=0)
+        )
+        
+        # Optional groups (e.g. conferences) for playoff odds
+        self.group_ids = None
+        if groups is not None:
+            names = sorted(set(groups.values()))
+            self.group_ids = np.array([names.index(groups[t]) for t in self.teams])
+
+    def simulate(self, n_sims=100000, chunk_size=10000, playoff_spots=7, seed=0):
+        """Run n_sims season outcomes and get a per-team odds table.
+
+        Ranks are by total wins with random tie-breaks (1 = best). Playoff
+        odds are the chance of finishing in the top playoff_spots of the
+        team's group (of the whole league without groups).
+        """
+        rng = np.random.default_rng(seed)
+        n_teams = len(self.teams)
+        win_counts = np.zeros((n_teams, self.max_wins + 1), dtype=np.int64)
+        rank_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+        playoff_counts = np.zeros(n_teams, dtype=np.int64)
+        team_offsets = np.arange(n_teams) * (self.max_wins + 1)
+        rank_offsets = np.arange(n_teams) * n_teams
+        
+        done = 0
+        while done < n_sims:
+            size = min(chunk_size, n_sims - done)
+            team1_won = (rng.random((size, len(self.probabilities))) < self.probabilities).astype(np.float32)
+            wins = (team1_won @ self.team1_matrix + (1 - team1_won) @ self.team2_matrix).astype(np.int32)
+            wins += self.current_wins
+            
+            # Rank by wins, breaking ties at random
+            order = np.argsort(-(wins + rng.random((size, n_teams))), axis=1)
+            ranks = np.empty_like(order)
+            np.put_along_axis(ranks, order, np.arange(n_teams), axis=1)
+            
+            win_counts += np.bincount(
+                (wins + team_offsets).ravel(), minlength=win_counts.size
+            ).reshape(win_counts.shape)
+            rank_counts += np.bincount(
+                (ranks + rank_offsets).ravel(), minlength=rank_counts.size
+            ).reshape(rank_counts.shape)
+            
+            if self.group_ids is None:
+                playoff_counts += (ranks < playoff_spots).sum(axis=0)
+            else:
+                for group in np.unique(self.group_ids):
+                    members = np.flatnonzero(self.group_ids == group)
+                    group_order = np.argsort(ranks[:, members], axis=1)
+                    group_ranks = np.empty_like(group_order)
+                    np.put_along_axis(group_ranks, group_order, np.arange(len(members)), axis=1)
+                    playoff_counts[members] += (group_ranks < playoff_spots).sum(axis=0)
+            done += size
+        
+        self.win_distribution = win_counts / n_sims
+        self.rank_distribution = rank_counts / n_sims
+        wins_range = np.arange(self.max_wins + 1)
+        
+        table = pd.DataFrame({
+            'team': self.teams,
+            'current_wins': self.current_wins,
+            'expected_wins': self.win_distribution @ wins_range,
+            'wins_p10': _percentile_from_counts(win_counts, 10),
+            'wins_p50': _percentile_from_counts(win_counts, 50),
+            'wins_p90': _percentile_from_counts(win_counts, 90),
+            'rank_p10': _percentile_from_counts(rank_counts, 10) + 1,
+            'rank_p50': _percentile_from_counts(rank_counts, 50) + 1,
+            'rank_p90': _percentile_from_counts(rank_counts, 90) + 1,
+            'top_seed_odds': self.rank_distribution[:, 0],
+            'playoff_odds': playoff_counts / n_sims,
+        })
+        return table.sort_values(['expected_wins', 'team'], ascending=[False, True]).reset_index(drop=True)
@@ -0,0 +1,204 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import threading
+
+from season_cache import CACHE_VERSION, cache_paths, read_parts
+import instrumentation
+
+# Compact dtypes for the numeric game columns
+COMPACT_DTYPES = {
+    'winner_pts': 'int16',
+    'loser_pts': 'int16',
+    'winner_yards': 'int16',
+    'loser_yards': 'int16',
+    'winner_turnovers': 'int8',
+    'loser_turnovers': 'int8',
+}
+
+# Values of the unnamed location column, from the winner's point of view
+WINNER_SITES = {'': 'home', '@': 'away', 'N': 'neutral'}
+
+def compact_games(df, season=None):
+    """Convert a raw games frame to compact dtypes."""
+    df = df.copy()
+    
+    # Keep the winner's location, then drop the unnamed columns
+    if 'unnamed:_5' in df.columns:
+        site = df['unnamed:_5'].fillna('').astype(str).map(WINNER_SITES)
+        df['winner_site'] = pd.Categorical(site, categories=['home', 'away', 'neutral'])
+    df = df.drop(columns=[c for c in df.columns if c.startswith('unnamed:')])
+    
+    df['date'] = pd.to_datetime(df['date'].astype(str), format='ISO8601')
+    for column, dtype in COMPACT_DTYPES.items():
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce')
+        df[column] = values.astype(dtype if values.notna().all() else dtype.capitalize())
+    
+    for column in df.columns:
+        if df[column].dtype == object or pd.api.types.is_string_dtype(df[column]):
+            df[column] = df[column].astype('category')
+    
+    if season is not None:
+        df['season'] = np.int16(season)
+    return df
+
+def _tmp_path(path):
+    """Get a temporary name for path that no other process or thread writes to."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def _save_frame(df, path):
+    """Write a compact frame to a .npz file atomically."""
+    arrays = {'__columns__': np.array(df.columns.tolist())}
+    kinds = []
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        key = f"c{i}"
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            kinds.append('category')
+            arrays[f"{key}_codes"] = series.cat.codes.to_numpy()
+            arrays[f"{key}_categories"] = np.array(series.cat.categories.astype(str).tolist())
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            kinds.append('datetime')
+            arrays[f"{key}_values"] = series.to_numpy('datetime64[ns]').view('int64')
+        elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            kinds.append('nullable')
+            arrays[f"{key}_values"] = series.fillna(0).to_numpy(series.dtype.numpy_dtype)
+            arrays[f"{key}_mask"] = series.isna().to_numpy()
+        else:
+            kinds.append('numeric')
+            arrays[f"{key}_values"] = series.to_numpy()
+    arrays['__kinds__'] = np.array(kinds)
+    
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+def _load_frame(path):
+    """Read a compact frame written by _save_frame."""
+    frame = {}
+    for column, (kind, part) in read_parts(path).items():
+        if kind == 'category':
+            frame[column] = pd.Categorical.from_codes(part['codes'], categories=part['categories'].tolist())
+        elif kind == 'datetime':
+            frame[column] = part['values'].view('datetime64[ns]')
+        elif kind == 'nullable':
+            frame[column] = pd.arrays.IntegerArray(part['values'], part['mask'])
+        else:
+            frame[column] = part['values']
+    return pd.DataFrame(frame, columns=list(frame))
+
+def _file_hash(path):
+    """Get SHA-1 of a file's contents."""
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def concat_seasons(frames):
+    """Concatenate season frames, keeping categorical columns categorical."""
+    frames = [f for f in frames if f is not None]
+    if len(frames) == 1:
+        return frames[0]
+    for column in frames[0].columns:
+        if not isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            continue
+        categories = sorted(set().union(*(f[column].cat.categories for f in frames if column in f)))
+        for f in frames:
+            if column in f:
+                f[column] = f[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+class SeasonStore:
+    """Per-season games files backed by an on-disk columnar cache.
+
+    Each nfl_{season}_games.csv gets a compact .npz copy in the cache
+    directory. The copy is rebuilt only when the CSV's size and mtime change
+    and its contents hash differs too. Seasons are read from the cache the
+    first time they are accessed.
+    """
+
+    def __init__(self, data_dir, cache_dir=None):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, '.cache')
+        self._partitions = {}
+        self._meta = {}
+
+    def season_file(self, season):
+        return os.path.join(self.data_dir, f"nfl_{season}_games.csv")
+
+    def _cache_paths(self, season):
+        return cache_paths(self.cache_dir, season)
+
+    def find_seasons(self, seasons):
+        """Get the seasons that have a games file on disk."""
+        return [s for s in seasons if os.path.exists(self.season_file(s))]
+
+    def refresh(self, season):
+        """Make sure a season's cache is current; return its metadata."""
+        csv_path = self.season_file(season)
+        npz_path, meta_path = self._cache_paths(season)
+        stat = os.stat(csv_path)
+        
+        meta = None
+        if os.path.exists(meta_path) and os.path.exists(npz_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('version') != CACHE_VERSION:
+                meta = None
+        
+        if meta is not None and meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+            instrumentation.count('season_cache_hits')
+            self._meta[season] = meta
+            return meta
+        
+        # File was touched: only rebuild if the contents actually changed
+        sha1 = _file_hash(csv_path)
+        if meta is None or meta['sha1'] != sha1:
+            instrumentation.count('season_cache_misses')
+            with instrumentation.span('parse_games_csv'):
+                df = compact_games(pd.read_csv(csv_path), season)
+            instrumentation.count('rows_parsed', len(df))
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _save_frame(df, npz_path)
+            self._partitions[season] = df
+            meta = {'version': CACHE_VERSION, 'rows': len(df)}
+        
+        meta.update({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1})
+        tmp_path = _tmp_path(meta_path)
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        self._meta[season] = meta
+        return meta
+
+    def count_games(self, season):
+        """Get a season's game count without loading it."""
+        if season not in self._meta:
+            self.refresh(season)
+        return self._meta[season]['rows']
+
+    def get_season(self, season):
+        """Get one season's games, loading it from the cache on first access."""
+        if season not in self._partitions:
+            if season not in self._meta:
+                self.refresh(season)
+            npz_path, _ = self._cache_paths(season)
+            with instrumentation.span('load_season_cache'):
+                self._partitions[season] = _load_frame(npz_path)
+            instrumentation.count('rows_loaded', len(self._partitions[season]))
+        return self._partitions[season]
+
+    def get_seasons(self, seasons):
+        """Get several seasons as one frame."""
+        return concat_seasons([self.get_season(s).copy() for s in seasons])
+
+    def invalidate(self, season):
+        """Forget a loaded season so the next access re-reads it."""
+        self._partitions.pop(season, None)
+        self._meta.pop(season, None)
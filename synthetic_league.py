@@ -0,0 +1,66 @@
+import pandas as pd
+import numpy as np
+
+GAME_COLUMNS = [
+    'week', 'day', 'date', 'time', 'winner', 'unnamed:_5', 'loser', 'unnamed:_7',
+    'winner_pts', 'loser_pts', 'winner_yards', 'winner_turnovers', 'loser_yards', 'loser_turnovers'
+]
+
+def team_names(n_teams):
+    """Get synthetic team names."""
+    return [f"Team {i:03d}" for i in range(n_teams)]
+
+def generate_league(n_teams=32, n_seasons=1, games_per_team=17, first_season=2023, seed=0):
+    """Generate a games_df with the same schema as nfl_{year}_games.csv.
+
+    Every week each team is paired with a random opponent (one team sits
+    out when n_teams is odd). Scores come from fixed per-team strengths
+    plus noise, so common-opponent results are not pure coin flips.
+    """
+    rng = np.random.default_rng(seed)
+    teams = np.array(team_names(n_teams))
+    strength = rng.normal(0, 4, n_teams)
+    
+    frames = []
+    for season in range(n_seasons):
+        season_start = pd.Timestamp(f"{first_season + season}-09-07 13:00")
+        for week in range(games_per_team):
+            order = rng.permutation(n_teams)[:n_teams - n_teams % 2]
+            home, away = order[0::2], order[1::2]
+            n_games = len(home)
+            
+            home_pts = np.clip(np.round(22 + strength[home] + 1.5 + rng.normal(0, 9, n_games)), 0, None)
+            away_pts = np.clip(np.round(22 + strength[away] + rng.normal(0, 9, n_games)), 0, None)
+            # No ties: the home team wins a level score
+            home_pts = np.where(home_pts == away_pts, home_pts + 3, home_pts)
+            home_won = home_pts > away_pts
+            
+            winner = np.where(home_won, home, away)
+            loser = np.where(home_won, away, home)
+            frames.append(pd.DataFrame({
+                'week': week + 1,
+                'day': 'Sun',
+                'date': season_start + pd.Timedelta(days=7 * week),
+                'time': '1:00PM',
+                'winner': teams[winner],
+                'unnamed:_5': np.where(home_won, '', '@'),
+                'loser': teams[loser],
+                'unnamed:_7': 'boxscore',
+                'winner_pts': np.maximum(home_pts, away_pts).astype(np.int64),
+                'loser_pts': np.minimum(home_pts, away_pts).astype(np.int64),
+                'winner_yards': rng.integers(250, 480, n_games),
+                'winner_turnovers': rng.integers(0, 3, n_games),
+                'loser_yards': rng.integers(200, 430, n_games),
+                'loser_turnovers': rng.integers(0, 4, n_games),
+            }, columns=GAME_COLUMNS))
+    
+    return pd.concat(frames, ignore_index=True)
+
+def write_league(data_dir, n_teams=32, n_seasons=1, games_per_team=17, first_season=2023, seed=0):
+    """Write one nfl_{season}_games.csv per synthetic season; returns the seasons."""
+    games_df = generate_league(n_teams, n_seasons, games_per_team, first_season, seed)
+    # January/February games belong to the previous season
+    seasons = games_df['date'].dt.year - (games_df['date'].dt.month < 3)
+    for season in sorted(seasons.unique()):
+        games_df[seasons == season].to_csv(f"{data_dir}/nfl_{season}_games.csv", index=False)
+    return sorted(seasons.unique().tolist())
@@ -0,0 +1,63 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from backtest import CommonOpponentState
+from common_opponents import chain_counts, common_opponent_points, result_indicators
+from synthetic_league import generate_league
+
+def _random_results(n_teams, seed):
+    """beat/lost indicators of a random league where some pairs meet twice."""
+    rng = np.random.default_rng(seed)
+    wins_matrix = np.zeros((n_teams, n_teams), dtype=np.int32)
+    for i, j in product(range(n_teams), repeat=2):
+        if i < j:
+            for _ in range(rng.integers(0, 3)):
+                winner, loser = (i, j) if rng.random() < 0.5 else (j, i)
+                wins_matrix[winner, loser] += 1
+    beat, lost, _ = result_indicators(wins_matrix)
+    return beat.astype(np.int64), lost.astype(np.int64)
+
+def _brute_force_chains(beat, lost, hops):
+    """Count chains i beat o1, ..., o_k-1 beat o_k, j lost to o_k one by one."""
+    n_teams = len(beat)
+    chains = np.zeros((n_teams, n_teams), dtype=np.int64)
+    for i, j in product(range(n_teams), repeat=2):
+        for opponents in product(range(n_teams), repeat=hops):
+            if i in opponents or j in opponents:
+                continue
+            path = (i,) + opponents
+            if all(beat[a, b] for a, b in zip(path, path[1:])) and lost[j, opponents[-1]]:
+                chains[i, j] += 1
+    return chains
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_chain_counts_match_brute_force(seed):
+    beat, lost = _random_results(7, seed)
+    chains = chain_counts(beat, lost, max_hops=3)
+    for hops, counts in enumerate(chains, 1):
+        assert np.array_equal(counts, _brute_force_chains(beat, lost, hops)), hops
+
+def test_chain_counts_of_a_stack():
+    seasons = [_random_results(6, seed) for seed in (3, 4)]
+    stacked = chain_counts(np.stack([b for b, _ in seasons]), np.stack([l for _, l in seasons]))
+    for s, (beat, lost) in enumerate(seasons):
+        for hops, counts in enumerate(chain_counts(beat, lost), 1):
+            assert np.array_equal(stacked[hops - 1][s], counts), (s, hops)
+
+@pytest.mark.parametrize('rule', ['any', 'last'])
+def test_state_deltas_match_full_recompute(rule):
+    games = generate_league(n_teams=12, games_per_team=15, seed=5)
+    teams = sorted(set(games['winner']) | set(games['loser']))
+    ids = {team: i for i, team in enumerate(teams)}
+    state = CommonOpponentState(len(teams), rule)
+    last_result = np.zeros((len(teams), len(teams)), dtype=np.int32)
+    for winner, loser in zip(games['winner'].map(ids), games['loser'].map(ids)):
+        state.apply(winner, loser)
+        last_result[winner, loser], last_result[loser, winner] = 1, -1
+
+        points, common = common_opponent_points(state.wins, last_result, rule)
+        assert np.array_equal(state.points, points)
+        off_diagonal = ~np.eye(len(teams), dtype=bool)
+        assert np.array_equal(state.common[off_diagonal], common[off_diagonal])
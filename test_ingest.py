@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+
+from nfl_data_prep import NFLDataPreprocessor
+import run_scraper
+from scraper_class import PFRScraper, week_rank
+from season_store import SeasonStore
+
+SEASON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nfl_data', 'nfl_2023_games.csv')
+
+def _scraped_games():
+    """The real 2023 season as scrape_game_scores returns it (dates without kickoff times)."""
+    games = pd.read_csv(SEASON_FILE)
+    games['date'] = pd.to_datetime(games['date']).dt.normalize()
+    return games
+
+def _store_through_week_17(data_dir, season=2023):
+    """Store the real 2023 CSV up to week 17 as a season's games file."""
+    stored = pd.read_csv(SEASON_FILE)
+    stored = stored[stored['week'].map(week_rank) <= 17]
+    stored.to_csv(os.path.join(data_dir, f'nfl_{season}_games.csv'), index=False)
+    return stored
+
+def test_ingest_into_2023_season(tmp_path):
+    data_dir = str(tmp_path)
+    stored = _store_through_week_17(data_dir)
+
+    scraper = PFRScraper(requests_per_second=None)
+    scraper.scrape_game_scores = lambda year: _scraped_games()
+
+    change_set = scraper.ingest_new_games(2023, output_dir=data_dir)
+    full = pd.read_csv(SEASON_FILE)
+    assert len(change_set['added_game_ids']) == len(full) - len(stored)
+
+    # Appended rows use the stored date format, kickoff time included
+    ingested = pd.read_csv(os.path.join(data_dir, 'nfl_2023_games.csv'))
+    assert ingested['date'].tolist() == full['date'].tolist()
+
+    # The season still loads, and a second ingest finds nothing new
+    games = SeasonStore(data_dir).get_season(2023)
+    assert len(games) == len(full)
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        preprocessor = NFLDataPreprocessor('.')
+        assert preprocessor.load_data([2023])
+        assert len(preprocessor.games_df) == len(full)
+    finally:
+        os.chdir(cwd)
+    assert scraper.ingest_new_games(2023, output_dir=data_dir)['added_game_ids'] == []
+
+def test_incremental_run_over_several_seasons(tmp_path, monkeypatch):
+    # --incremental with several years must ingest each one, never rescrape
+    data_dir = tmp_path / 'nfl_data'
+    data_dir.mkdir()
+    for season in (2022, 2023):
+        _store_through_week_17(str(data_dir), season)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(PFRScraper, 'scrape_game_scores', lambda self, year: _scraped_games())
+
+    run_scraper.main(['--incremental', '--no-cache', '2022', '--through', '2023'])
+
+    full = pd.read_csv(SEASON_FILE)
+    for season in (2022, 2023):
+        ingested = pd.read_csv(data_dir / f'nfl_{season}_games.csv')
+        assert ingested['date'].tolist() == full['date'].tolist()
+        assert (data_dir / f'nfl_{season}_changes.jsonl').exists()
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from parallel_rankings import ParallelRanker
+from synthetic_league import generate_league
+from what_if import ScenarioEngine
+
+def _partial_season(seed=3, played_weeks=9):
+    """A season whose games after played_weeks are scheduled but unscored."""
+    games = generate_league(seed=seed)
+    scheduled = games['week'] > played_weeks
+    games['winner_pts'] = games['winner_pts'].astype(float).where(~scheduled)
+    games['loser_pts'] = games['loser_pts'].astype(float).where(~scheduled)
+    return games, np.flatnonzero(~scheduled), np.flatnonzero(scheduled)
+
+def test_rankers_ignore_scheduled_games():
+    games, played, _ = _partial_season()
+    ranker = ParallelRanker(games, workers=1)
+    engine = ScenarioEngine(games, season=2023)
+    assert ranker.rank_seasons()[2023].equals(engine.base_ranking())
+
+    # The unscored rows rank the same as if they were not there at all
+    played_only = ParallelRanker(games.iloc[played].reset_index(drop=True), workers=1)
+    assert ranker.rank_seasons()[2023].equals(played_only.rank_seasons()[2023])
+
+    scenarios = {i: {'flip': [int(played[i])], 'drop': [int(played[i + 1])]} for i in range(20)}
+    tables = ranker.rank_scenarios(scenarios, season=2023)
+    for name, table in engine.rank_scenarios(scenarios).items():
+        assert tables[name].equals(table), name
+
+def test_scenarios_reject_scheduled_games():
+    games, _, scheduled = _partial_season()
+    ranker = ParallelRanker(games, workers=1)
+    with pytest.raises(ValueError):
+        ranker.rank_scenarios({'x': {'flip': [int(scheduled[0])]}}, season=2023)
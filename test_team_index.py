@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from nfl_data_prep import TeamIndex
+from synthetic_league import generate_league
+
+INDEX_ARRAYS = [
+    'winner_ids', 'loser_ids', 'team_rows', 'team_opponents', 'team_won', 'team_offsets',
+    'wins_matrix', 'losses_matrix', 'games_matrix', 'margin_matrix', 'last_result_matrix',
+]
+
+def _assert_same_index(index, expected):
+    for name in INDEX_ARRAYS:
+        assert np.array_equal(getattr(index, name), getattr(expected, name)), name
+    assert len(index.games_df) == len(expected.games_df)
+
+def test_append_games_matches_fresh_index():
+    games = generate_league(n_seasons=2, seed=1)
+    index = TeamIndex(games.iloc[:300].reset_index(drop=True))
+    for start, stop in [(300, 301), (301, 420), (420, len(games))]:
+        assert index.append_games(games.iloc[start:stop])
+    _assert_same_index(index, TeamIndex(games))
+
+def test_bad_batch_leaves_index_unchanged():
+    games = generate_league(seed=2)
+    index = TeamIndex(games.iloc[:200].reset_index(drop=True))
+    with pytest.raises(ValueError):
+        index.append_games(games.iloc[200:210].drop(columns=['winner_pts']))
+    _assert_same_index(index, TeamIndex(games.iloc[:200].reset_index(drop=True)))
+
+    # The next good batch lines up with the rows again
+    assert index.append_games(games.iloc[200:])
+    _assert_same_index(index, TeamIndex(games))
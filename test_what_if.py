@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from common_opponents import common_opponent_points, rank_teams
+from synthetic_league import generate_league
+from what_if import ScenarioEngine
+
+def _random_scenarios(engine, n_scenarios, seed):
+    rng = np.random.default_rng(seed)
+    scenarios = {}
+    for name in range(n_scenarios):
+        rows = rng.choice(engine.rows, size=rng.integers(0, 8), replace=False).tolist()
+        cut = rng.integers(0, len(rows) + 1)
+        added = [tuple(rng.choice(engine.teams, 2, replace=False)) for _ in range(rng.integers(0, 4))]
+        scenarios[name] = {'flip': rows[:cut], 'drop': rows[cut:], 'add': added}
+    return scenarios
+
+def _rebuilt_points(games, engine, scenario, rule):
+    """Common-opponent points of a scenario, rebuilt from its games in kickoff order."""
+    ids = engine.team_ids
+    n_teams = len(engine.teams)
+    wins = np.zeros((n_teams, n_teams), dtype=np.int32)
+    last_result = np.zeros((n_teams, n_teams), dtype=np.int32)
+    played = []
+    for row in engine.rows.tolist():
+        if row in scenario['drop']:
+            continue
+        winner, loser = ids[games['winner'][row]], ids[games['loser'][row]]
+        played.append((loser, winner) if row in scenario['flip'] else (winner, loser))
+    played += [(ids[winner], ids[loser]) for winner, loser in scenario['add']]
+    for winner, loser in played:
+        wins[winner, loser] += 1
+        last_result[winner, loser], last_result[loser, winner] = 1, -1
+    points, _ = common_opponent_points(wins, last_result, rule)
+    return points
+
+@pytest.mark.parametrize('rule', ['any', 'last'])
+def test_scenarios_match_full_rebuild(rule):
+    games = generate_league(n_teams=16, seed=4)
+    engine = ScenarioEngine(games, season=2023, rule=rule)
+    base = (engine.points.copy(), engine.scores.copy(), engine.beat.copy(), engine.lost.copy())
+    scenarios = _random_scenarios(engine, 60, seed=6)
+
+    names, scores, ranks = engine.evaluate(scenarios)
+    for s, name in enumerate(names):
+        points = _rebuilt_points(games, engine, scenarios[name], rule)
+        assert np.array_equal(scores[s], points.sum(axis=1)), name
+        order = [team for team, *_ in rank_teams(engine.teams, points)]
+        assert order == [engine.teams[t] for t in np.argsort(ranks[s])], name
+
+    # Undoing every scenario's patches leaves the season as it was
+    for before, after in zip(base, (engine.points, engine.scores, engine.beat, engine.lost)):
+        assert np.array_equal(before, after)
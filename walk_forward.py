@@ -0,0 +1,240 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+# Hyperparameters swept by default (each maps to a list of values)
+DEFAULT_GRID = {
+    'units': [8, 16],
+    'dropout': [0.3],
+    'learning_rate': [0.001],
+    'n_games': [5],
+}
+
+# Set in each worker by _init_worker
+_worker = {}
+
+def game_periods(games_df, rows, by='season'):
+    """Get a sortable period label for each game row: its season, or (season, week)."""
+    games = games_df.iloc[rows]
+    if 'season' in games.columns:
+        seasons = games['season'].to_numpy().astype(np.int64)
+    else:
+        # January/February games belong to the previous season
+        dates = pd.to_datetime(games['date'])
+        seasons = (dates.dt.year - (dates.dt.month < 3)).to_numpy()
+    if by == 'season':
+        return seasons
+    if by != 'week':
+        raise ValueError(f"Unknown period: {by}")
+    # Playoff rounds ('WildCard', ...) sort after the regular season
+    weeks = pd.to_numeric(games['week'].astype(str), errors='coerce').fillna(100).to_numpy()
+    return seasons * 1000 + weeks.astype(np.int64)
+
+def walk_forward_folds(periods, min_train_periods=1, max_folds=None):
+    """Get [(label, train_positions, test_positions)]: train on periods <= t, test on t+1."""
+    order = np.unique(periods)
+    folds = []
+    for k in range(min_train_periods, len(order)):
+        train = np.flatnonzero(periods < order[k])
+        test = np.flatnonzero(periods == order[k])
+        folds.append((int(order[k]), train, test))
+    if max_folds is not None:
+        folds = folds[-max_folds:]
+    return folds
+
+def expand_grid(grid):
+    """Get one config dict per combination of the grid's values."""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+def _init_worker(games_df, threads):
+    """Pool initializer: cap BLAS/TensorFlow threads and keep the games for feature building."""
+    from threadpoolctl import threadpool_limits
+
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    # BLAS pools already loaded (e.g. by numpy before a fork) ignore the env vars
+    _worker['thread_limits'] = threadpool_limits(threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+    _worker['games_df'] = games_df
+    _worker['features'] = {}
+
+def _features(n_games):
+    """Get (X, y, rows) for a history length, built once per worker."""
+    from nfl_features import TeamFeatureBuilder
+
+    if n_games not in _worker['features']:
+        _worker['features'][n_games] = TeamFeatureBuilder(_worker['games_df'], n_games).build_training_set()
+    return _worker['features'][n_games]
+
+def _run_fold(task):
+    """Train one config on one fold's training periods and score the next period."""
+    import tensorflow as tf
+    from nfl_predictor import NFLPredictor
+
+    trial, config, seed, fold, train_rows, test_rows, epochs, batch_size = task
+    X, y, rows = _features(config['n_games'])
+    position = {row: i for i, row in enumerate(rows.tolist())}
+    train = np.array([position[r] for r in train_rows], dtype=np.int64)
+    test = np.array([position[r] for r in test_rows], dtype=np.int64)
+
+    start = time.perf_counter()
+    tf.keras.utils.set_random_seed(seed)
+    predictor = NFLPredictor(config['units'], config['dropout'], config['learning_rate'])
+    X_train = predictor.scaler.fit_transform(X[train])
+    X_test = predictor.scaler.transform(X[test])
+    predictor.model = predictor.build_model(X.shape[1], summary=False)
+    predictor.model.fit(X_train, y[train], epochs=epochs, batch_size=batch_size, verbose=0)
+    loss, accuracy = predictor.model.evaluate(X_test, y[test], verbose=0)
+    return {
+        'trial': trial, **config, 'seed': seed, 'fold': fold,
+        'train_games': len(train), 'test_games': len(test),
+        'accuracy': float(accuracy), 'log_loss': float(loss),
+        'seconds': time.perf_counter() - start,
+    }
+
+class WalkForwardSweep:
+    """Time-ordered cross-validation of NFLPredictor over a hyperparameter grid.
+
+    Each fold trains on every game up to a period (season, or week) and
+    tests on the next one, so no future game is ever in the training set.
+    Every (config, fold) pair is one task on a process pool; each worker
+    caps its BLAS/TensorFlow threads so workers do not oversubscribe the
+    CPUs, and every trial trains from a fixed seed (seed + trial number).
+    """
+
+    def __init__(self, games_df, grid=None, by='season', min_train_periods=1, max_folds=None,
+                 epochs=20, batch_size=32, seed=42, workers=None, threads_per_worker=1):
+        self.games_df = games_df
+        self.configs = expand_grid(grid or DEFAULT_GRID)
+        self.by = by
+        self.min_train_periods = min_train_periods
+        self.max_folds = max_folds
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.seed = seed
+        self.workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.threads_per_worker = threads_per_worker
+
+    def folds(self):
+        """Get [(label, train games_df rows, test games_df rows)]."""
+        from nfl_features import TeamFeatureBuilder
+
+        # Completed games are the same for every history length
+        _, _, rows = TeamFeatureBuilder(self.games_df, 1).build_training_set()
+        periods = game_periods(self.games_df, rows, self.by)
+        return [
+            (label, rows[train], rows[test])
+            for label, train, test in walk_forward_folds(periods, self.min_train_periods, self.max_folds)
+        ]
+
+    def run(self):
+        """Get (ranked summary, per-fold results) DataFrames."""
+        folds = self.folds()
+        if not folds:
+            raise ValueError("Need at least two periods of games for walk-forward folds")
+        tasks = [
+            (trial, config, self.seed + trial, label, train, test, self.epochs, self.batch_size)
+            for trial, config in enumerate(self.configs)
+            for label, train, test in folds
+        ]
+        print(f"Running {len(self.configs)} configs x {len(folds)} folds on {self.workers} workers "
+              f"({self.threads_per_worker} thread(s) each)")
+
+        with instrumentation.span('walk_forward_sweep'):
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.games_df, self.threads_per_worker)
+            ) as executor:
+                results = pd.DataFrame(list(executor.map(_run_fold, tasks)))
+        instrumentation.count('sweep_folds', len(tasks))
+        return summarize(results), results
+
+def summarize(results):
+    """Rank configs by accuracy over all their test games (ties: lower log loss)."""
+    params = [c for c in results.columns if c in DEFAULT_GRID]
+    # Weight folds by their number of test games
+    weighted = results.assign(correct=results['accuracy'] * results['test_games'])
+    summary = weighted.groupby(['trial'] + params, as_index=False).agg(
+        folds=('fold', 'size'),
+        test_games=('test_games', 'sum'),
+        correct=('correct', 'sum'),
+        fold_accuracy_std=('accuracy', 'std'),
+        log_loss=('log_loss', 'mean'),
+        mean_fold_seconds=('seconds', 'mean'),
+        total_seconds=('seconds', 'sum'),
+    )
+    summary.insert(len(params) + 1, 'accuracy', summary.pop('correct') / summary['test_games'])
+    summary = summary.sort_values(['accuracy', 'log_loss'], ascending=[False, True], kind='stable')
+    summary.insert(0, 'rank', np.arange(1, len(summary) + 1))
+    return summary.reset_index(drop=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Walk-forward cross-validation and hyperparameter sweep')
+    parser.add_argument('first_season', type=int)
+    parser.add_argument('last_season', type=int)
+    parser.add_argument('--units', type=int, nargs='+', default=DEFAULT_GRID['units'])
+    parser.add_argument('--dropout', type=float, nargs='+', default=DEFAULT_GRID['dropout'])
+    parser.add_argument('--learning-rate', type=float, nargs='+', default=DEFAULT_GRID['learning_rate'])
+    parser.add_argument('--n-games', type=int, nargs='+', default=DEFAULT_GRID['n_games'],
+                        help='History lengths (previous games per team)')
+    parser.add_argument('--by', choices=['season', 'week'], default='season',
+                        help='Fold period: train on periods <= t, test on t+1')
+    parser.add_argument('--min-train-periods', type=int, default=1)
+    parser.add_argument('--max-folds', type=int, default=None,
+                        help='Only evaluate the last N folds')
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: CPUs / threads per worker)')
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--output', help='Write per-fold results to this CSV file')
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    from nfl_data_prep import NFLDataPreprocessor
+
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    preprocessor = NFLDataPreprocessor()
+    if not preprocessor.load_data(range(args.first_season, args.last_season + 1)):
+        print("Failed to load data")
+        return
+
+    grid = {
+        'units': args.units,
+        'dropout': args.dropout,
+        'learning_rate': args.learning_rate,
+        'n_games': args.n_games,
+    }
+    sweep = WalkForwardSweep(
+        preprocessor.games_df, grid, by=args.by, min_train_periods=args.min_train_periods,
+        max_folds=args.max_folds, epochs=args.epochs, seed=args.seed,
+        workers=args.workers, threads_per_worker=args.threads_per_worker
+    )
+    summary, results = sweep.run()
+
+    print("\nPer-fold results:")
+    print("=================")
+    print(results.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print("\nRanked configurations (walk-forward accuracy):")
+    print("==============================================")
+    print(summary.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\nSaved per-fold results to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common_opponents import rank_scores
+import instrumentation
+
+class ScenarioEngine:
+    """What-if common-opponent rankings for one season's games.
+
+    A scenario changes a few games: 'flip' reverses results and 'drop'
+    removes games (both lists of games_df row positions), and 'add' plays
+    hypothetical (winner, loser) games after every real one. Only the
+    touched (team, opponent) cells of the beat/lost/played indicators
+    change, so each cell patches one row or column of points = beat @ lost.T
+    and the per-team scores (O(teams)), as CommonOpponentState does. After
+    a scenario is scored the same patches restore the season's state, so
+    thousands of scenarios are evaluated without ever recomputing the
+    full pairwise comparison.
+
+    rule='any' matches nfl-scores.py, rule='last' run_predictor.py.
+    """
+
+    def __init__(self, games_df, season=None, rule='any'):
+        if rule not in ('any', 'last'):
+            raise ValueError(f"Unknown rule: {rule}")
+        self.games_df = games_df
+        self.rule = rule
+
+        if 'season' in games_df.columns:
+            seasons = games_df['season'].to_numpy()
+        else:
+            # January/February games belong to the previous season
+            dates = pd.to_datetime(games_df['date'])
+            seasons = (dates.dt.year - (dates.dt.month < 3)).to_numpy()
+        in_season = np.ones(len(games_df), dtype=bool) if season is None else seasons == season
+        completed = pd.to_numeric(games_df['winner_pts'], errors='coerce').notna().to_numpy()
+
+        # Completed games in kickoff order (row order breaks ties)
+        rows = np.flatnonzero(in_season & completed)
+        dates = pd.to_datetime(games_df['date']).to_numpy()[rows]
+        self.rows = rows[np.argsort(dates, kind='stable')]
+        self.position = {row: g for g, row in enumerate(self.rows.tolist())}
+
+        winners = games_df['winner'].astype(str).to_numpy()
+        losers = games_df['loser'].astype(str).to_numpy()
+        scheduled = np.flatnonzero(in_season)
+        self.teams = sorted(set(winners[scheduled]) | set(losers[scheduled]))
+        self.team_ids = {team: i for i, team in enumerate(self.teams)}
+        self.winner_ids = np.array([self.team_ids[t] for t in winners[self.rows]], dtype=np.int64)
+        self.loser_ids = np.array([self.team_ids[t] for t in losers[self.rows]], dtype=np.int64)
+        # Unplayed schedule rows, for win_out
+        self.remaining = [(winners[r], losers[r]) for r in scheduled if not completed[r]]
+
+        # Games of each pair (a < b), in kickoff order
+        self.pair_games = {}
+        for g, (w, l) in enumerate(zip(self.winner_ids.tolist(), self.loser_ids.tolist())):
+            self.pair_games.setdefault((min(w, l), max(w, l)), []).append(g)
+
+        n_teams = len(self.teams)
+        self.beat = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.lost = np.zeros((n_teams, n_teams), dtype=np.int32)
+        self.played = np.zeros((n_teams, n_teams), dtype=np.int32)
+        for (a, b), games in self.pair_games.items():
+            cells = self._pair_cells([self.winner_ids[g] == a for g in games])
+            self.beat[a, b], self.lost[a, b], self.beat[b, a], self.lost[b, a], played = cells
+            self.played[a, b] = self.played[b, a] = played
+        with instrumentation.span('scenario_base_state'):
+            self.points = self.beat @ self.lost.T
+            self.scores = self.points.sum(axis=1)
+        self.compared = np.full(n_teams, n_teams - 1)
+
+    def _pair_cells(self, results):
+        """Get (beat[a, b], lost[a, b], beat[b, a], lost[b, a], played) from a pair's results.
+
+        results lists, in kickoff order, whether team a won each game.
+        """
+        if not results:
+            return 0, 0, 0, 0, 0
+        if self.rule == 'last':
+            a_won = int(results[-1])
+            return a_won, 1 - a_won, 1 - a_won, a_won, 1
+        a_beat = int(any(results))
+        b_beat = int(not all(results))
+        return a_beat, 1 - a_beat, b_beat, 1 - b_beat, 1
+
+    def _set_cell(self, a, o, beat, lost):
+        """Set beat[a, o] and lost[a, o], patching points and scores."""
+        delta = beat - self.beat[a, o]
+        if delta:
+            column = self.lost[:, o]
+            self.points[a, :] += delta * column
+            self.scores[a] += delta * column.sum()
+            self.beat[a, o] = beat
+        delta = lost - self.lost[a, o]
+        if delta:
+            column = self.beat[:, o]
+            self.points[:, a] += delta * column
+            self.scores += delta * column
+            self.lost[a, o] = lost
+
+    def _set_pair(self, a, b, cells):
+        beat_ab, lost_ab, beat_ba, lost_ba, played = cells
+        self._set_cell(a, b, beat_ab, lost_ab)
+        self._set_cell(b, a, beat_ba, lost_ba)
+        self.played[a, b] = self.played[b, a] = played
+
+    def _game(self, row):
+        """Get the position of a games_df row among the season's completed games."""
+        if row not in self.position:
+            raise ValueError(f"Not a completed game row: {row}")
+        return self.position[row]
+
+    def _pair_results(self, scenario):
+        """Get {(a, b): [team a won?, ...]} for every pair a scenario touches."""
+        flip = {self._game(row) for row in scenario.get('flip', [])}
+        drop = {self._game(row) for row in scenario.get('drop', [])}
+        pairs = {}
+        for g in sorted(flip | drop):
+            w, l = int(self.winner_ids[g]), int(self.loser_ids[g])
+            pairs[(min(w, l), max(w, l))] = None
+        added = []
+        for winner, loser in scenario.get('add', []):
+            for team in (winner, loser):
+                if team not in self.team_ids:
+                    raise ValueError(f"Unknown team: {team}")
+            w, l = self.team_ids[winner], self.team_ids[loser]
+            pairs[(min(w, l), max(w, l))] = None
+            added.append((w, l))
+
+        for a, b in pairs:
+            pairs[(a, b)] = [
+                (self.winner_ids[g] == a) != (g in flip)
+                for g in self.pair_games.get((a, b), []) if g not in drop
+            ]
+        for w, l in added:
+            pairs[(min(w, l), max(w, l))].append(w < l)
+        return pairs
+
+    def apply(self, scenario):
+        """Apply a scenario in place; returns the undo list for restore()."""
+        undo = []
+        for (a, b), results in self._pair_results(scenario).items():
+            undo.append((a, b, (
+                self.beat[a, b], self.lost[a, b], self.beat[b, a], self.lost[b, a], self.played[a, b]
+            )))
+            self._set_pair(a, b, self._pair_cells(results))
+        instrumentation.count('scenario_pairs_patched', len(undo))
+        return undo
+
+    def restore(self, undo):
+        """Undo apply()."""
+        for a, b, cells in reversed(undo):
+            self._set_pair(a, b, cells)
+
+    def evaluate(self, scenarios):
+        """Score many scenarios in one call.
+
+        scenarios maps a name to {'flip': [...], 'drop': [...], 'add': [...]}.
+        Returns (names, scores, ranks): scores[s, t] is team t's points and
+        ranks[s, t] its rank (1 = best) under scenario s.
+        """
+        names = list(scenarios)
+        scores = np.empty((len(names), len(self.teams)), dtype=self.scores.dtype)
+        with instrumentation.span('evaluate_scenarios'):
+            for s, name in enumerate(names):
+                undo = self.apply(scenarios[name])
+                scores[s] = self.scores
+                self.restore(undo)
+            ranks = self._ranks(scores)
+        instrumentation.count('scenarios_evaluated', len(names))
+        return names, scores, ranks
+
+    def _ranks(self, scores):
+        """Get each row's ranks, ordered as rank_scores orders teams."""
+        average = scores / np.maximum(self.compared, 1)
+        order = np.argsort(-average, axis=-1, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(self.teams) + 1), axis=-1)
+        return ranks
+
+    def _table(self, scores):
+        ranking = rank_scores(self.teams, scores, self.compared)
+        return pd.DataFrame(
+            [(rank, team, score, compared, avg) for rank, (team, score, compared, avg) in enumerate(ranking, 1)],
+            columns=['rank', 'team', 'score', 'comparisons', 'avg']
+        )
+
+    def base_ranking(self):
+        """Get the season's ranking table (rank, team, score, comparisons, avg)."""
+        return self._table(self.scores)
+
+    def rank_scenarios(self, scenarios):
+        """Get {name: ranking table} for each scenario (see ParallelRanker.rank_scenarios)."""
+        names, scores, _ = self.evaluate(scenarios)
+        return {name: self._table(row) for name, row in zip(names, scores)}
+
+    def find_games(self, team1, team2):
+        """Get the games_df rows of every completed game between two teams."""
+        for team in (team1, team2):
+            if team not in self.team_ids:
+                raise ValueError(f"Unknown team: {team}")
+        a, b = sorted((self.team_ids[team1], self.team_ids[team2]))
+        return [int(self.rows[g]) for g in self.pair_games.get((a, b), [])]
+
+    def win_out(self, team):
+        """Get a scenario where a team wins all of its unplayed games."""
+        if team not in self.team_ids:
+            raise ValueError(f"Unknown team: {team}")
+        return {'add': [
+            (team, loser if winner == team else winner)
+            for winner, loser in self.remaining if team in (winner, loser)
+        ]}
+
+    def single_flips(self):
+        """Get {row: scenario} flipping each completed game on its own."""
+        return {int(row): {'flip': [int(row)]} for row in self.rows}
+
+def print_scenario(table, base):
+    """Print a scenario's ranking in the nfl-scores.py format, with moves against the base ranking."""
+    base_rank = dict(zip(base['team'], base['rank']))
+    print("\nScenario Team Rankings (based on common opponent performance):")
+    print("========================================================")
+    for row in table.itertuples(index=False):
+        move = base_rank[row.team] - row.rank
+        change = f" ({move:+d})" if move else ""
+        print(f"{row.rank}. {row.team:<30} Score: {row.score:>3} points in {row.comparisons:>2} comparisons (Avg: {row.avg:.2f}){change}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='What-if common-opponent rankings: flip, drop or add games')
+    parser.add_argument('season', type=int, nargs='?', default=2023)
+    parser.add_argument('--flip', nargs=2, action='append', default=[], metavar=('TEAM1', 'TEAM2'),
+                        help='Reverse every game between two teams')
+    parser.add_argument('--drop', nargs=2, action='append', default=[], metavar=('TEAM1', 'TEAM2'),
+                        help='Remove every game between two teams')
+    parser.add_argument('--add', nargs=2, action='append', default=[], metavar=('WINNER', 'LOSER'),
+                        help='Add a hypothetical game')
+    parser.add_argument('--win-out', action='append', default=[], metavar='TEAM',
+                        help='Team wins all of its unplayed games')
+    parser.add_argument('--each-flip', type=int, nargs='?', const=10, default=None, metavar='N',
+                        help='Flip every game on its own and show the N that move the rankings most')
+    parser.add_argument('--rule', choices=['any', 'last'], default='any',
+                        help="'any' as nfl-scores.py, 'last' as run_predictor.py")
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args()
+
+def main():
+    from nfl_data_prep import NFLDataPreprocessor
+
+    args = parse_args()
+    instrumentation.enable_from_args(args)
+    preprocessor = NFLDataPreprocessor()
+    if not preprocessor.load_data([args.season]):
+        print("Failed to load data")
+        return
+
+    engine = ScenarioEngine(preprocessor.games_df, args.season, args.rule)
+    base = engine.base_ranking()
+
+    if args.each_flip is not None:
+        scenarios = engine.single_flips()
+        start = time.perf_counter()
+        rows, _, ranks = engine.evaluate(scenarios)
+        seconds = time.perf_counter() - start
+        print(f"\nEvaluated {len(rows)} single-game flips in {seconds * 1000:.1f} ms")
+
+        base_ranks = engine._ranks(engine.scores)
+        moved = np.abs(ranks - base_ranks).sum(axis=1)
+        games = engine.games_df
+        print(f"\nGames whose result moves the rankings most:")
+        for s in np.argsort(-moved, kind='stable')[:args.each_flip]:
+            row = rows[s]
+            leader = engine.teams[int(np.argmin(ranks[s]))]
+            print(f"{str(games['date'].iloc[row])[:10]} {games['winner'].iloc[row]} beat {games['loser'].iloc[row]}: "
+                  f"{moved[s]} rank places move, leader {leader}")
+        return
+
+    scenario = {'flip': [], 'drop': [], 'add': [tuple(game) for game in args.add]}
+    try:
+        for team1, team2 in args.flip:
+            scenario['flip'] += engine.find_games(team1, team2)
+        for team1, team2 in args.drop:
+            scenario['drop'] += engine.find_games(team1, team2)
+        for team in args.win_out:
+            scenario['add'] += engine.win_out(team)['add']
+        table = engine.rank_scenarios({'scenario': scenario})['scenario']
+    except ValueError as e:
+        print(f"Invalid scenario: {e}")
+        return
+    print(f"Scenario: {len(scenario['flip'])} flipped, {len(scenario['drop'])} dropped, "
+          f"{len(scenario['add'])} added games")
+    print_scenario(table, base)
+
+if __name__ == "__main__":
+    main()